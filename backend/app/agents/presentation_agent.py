@@ -192,6 +192,8 @@ class PresentationAgent:
         NO usa LLM para la estructura, solo para narrativa.
         """
         slots = SlotConfig()
+        # Un solo set para todas las consultas de pertenencia de refs
+        available_refs = payload.available_refs_set
 
         # === MODO COMPARACION ===
         if payload.comparison and payload.comparison.is_comparison:
@@ -226,7 +228,7 @@ class PresentationAgent:
             ]
 
             for label, ref, fmt, delta in kpi_configs:
-                if ref in payload.available_refs:
+                if ref in available_refs:
                     trend = None
                     if delta is not None:
                         trend = "up" if delta > 0 else "down" if delta < 0 else "neutral"
@@ -244,7 +246,7 @@ class PresentationAgent:
             if payload.time_series:
                 for ts in payload.time_series:
                     ref = f"ts.{ts.series_name}"
-                    if ref in payload.available_refs:
+                    if ref in available_refs:
                         slots.charts.append(ChartConfig(
                             type="line_chart",
                             title=f"Tendencia: {self._format_title(ts.series_name)}",
@@ -257,7 +259,7 @@ class PresentationAgent:
             if payload.top_items:
                 for top in payload.top_items:
                     ref = f"top.{top.ranking_name}"
-                    if ref in payload.available_refs:
+                    if ref in available_refs:
                         slots.charts.append(ChartConfig(
                             type="bar_chart",
                             title=self._format_title(top.ranking_name),
@@ -296,7 +298,7 @@ class PresentationAgent:
                 ("Tasa Respuesta", "kpi.answer_rate", "percent"),
             ]
             for label, ref, fmt in all_kpis:
-                if ref in payload.available_refs:
+                if ref in available_refs:
                     slots.series.append(KpiCardConfig(
                         label=label,
                         value_ref=ref,
@@ -307,7 +309,7 @@ class PresentationAgent:
         if payload.time_series:
             for ts in payload.time_series:
                 ref = f"ts.{ts.series_name}"
-                if ref in payload.available_refs or f"ts.{ts.series_name}" in payload.available_refs:
+                if ref in available_refs:
                     # Determinar tipo de grafico
                     chart_type = "line_chart"
                     if "revenue" in ts.series_name.lower():
@@ -325,7 +327,7 @@ class PresentationAgent:
         if payload.top_items:
             for top in payload.top_items:
                 ref = f"top.{top.ranking_name}"
-                if ref in payload.available_refs or f"top.{top.ranking_name}" in payload.available_refs:
+                if ref in available_refs:
                     slots.charts.append(ChartConfig(
                         type="bar_chart",
                         title=self._format_title(top.ranking_name),
@@ -842,9 +844,10 @@ NO uses templates genéricos. Analiza los datos específicos y genera observacio
         Remueve componentes con refs invalidas.
         """
         # Filtrar KPIs
+        available = frozenset(available_refs)
         valid_series = [
             kpi for kpi in spec.slots.series
-            if kpi.value_ref in available_refs
+            if kpi.value_ref in available
         ]
         spec.slots.series = valid_series
 
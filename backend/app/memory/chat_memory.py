@@ -50,19 +50,23 @@ class SupabaseMemoryClient:
 
     def insert(self, table: str, data: Dict) -> bool:
         """Insert a row into a table"""
+        return self.insert_returning(table, data) is not None
+
+    def insert_returning(self, table: str, data: Dict) -> Optional[List[Dict]]:
+        """Insert a row and return the stored rows (Prefer: return=representation), None on error"""
         if not self._available:
-            return False
+            return None
 
         try:
             url = f"{self.base_url}/rest/v1/{table}"
             response = self.client.post(url, headers=self.headers, json=data)
             if response.status_code >= 400:
                 print(f"[MemoryClient] Insert error: {response.status_code} - {response.text}")
-                return False
-            return True
+                return None
+            return response.json() if response.text else []
         except Exception as e:
             print(f"[MemoryClient] Insert exception: {e}")
-            return False
+            return None
 
     def select(self, table: str, filters: Dict[str, str], select: str = "*",
                order: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
@@ -1,7 +1,7 @@
 """
 Dashboard Spec schemas - Define la estructura del JSON que renderiza el frontend
 """
-from typing import Optional, List, Literal, Union
+from typing import Optional, List, Literal, Union, FrozenSet
 from pydantic import BaseModel, Field
 
 
@@ -67,6 +67,18 @@ class DashboardSpec(BaseModel):
     slots: SlotConfig = Field(..., description="Contenido de los slots")
     generated_at: Optional[str] = Field(None, description="Timestamp de generacion")
 
+    @property
+    def all_refs(self) -> FrozenSet[str]:
+        """Todas las refs del spec (KPIs, deltas y datasets de graficos) en una pasada"""
+        # Sin cache: el PresentationAgent filtra y agrega slots despues de construir el spec
+        refs = set()
+        for kpi in self.slots.series:
+            refs.add(kpi.value_ref)
+            if (delta_ref := kpi.delta_ref) is not None:
+                refs.add(delta_ref)
+        refs.update(chart.dataset_ref for chart in self.slots.charts)
+        return frozenset(refs)
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -1,7 +1,7 @@
 """
 Payload schemas - Define la estructura de los datos retornados por las queries
 """
-from typing import Optional, List, Dict, Any, Literal
+from typing import Optional, List, Dict, Any, Literal, FrozenSet
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -141,3 +141,9 @@ class DataPayload(BaseModel):
         default_factory=list,
         description="Lista de refs disponibles para el spec (kpi.total_sales, ts.sales_by_day, etc)"
     )
+
+    @property
+    def available_refs_set(self) -> FrozenSet[str]:
+        """available_refs como frozenset, para chequeos de pertenencia O(1)"""
+        # Sin cache: DataAgent agrega refs a la lista despues de construir el payload
+        return frozenset(self.available_refs)
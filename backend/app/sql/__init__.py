@@ -2,18 +2,27 @@ from .allowlist import (
     QUERY_ALLOWLIST,
     get_query_template,
     validate_query_id,
+    validate_query_ids,
     get_available_queries,
     build_params
 )
 from .schema_registry import (
     SCHEMA_REGISTRY,
+    SCHEMA_COLUMNS,
     SCHEMA_CONTEXT,
     get_schema_context,
+    find_columns,
     get_table_info,
     get_available_tables,
     get_column_names,
+    get_materialized_views,
+    generate_materialized_views_sql,
+    generate_fk_indexes,
+    generate_filter_indexes,
+    generate_indexes_sql,
     TableInfo,
-    ColumnInfo
+    ColumnInfo,
+    MVSpec
 )
 
 __all__ = [
@@ -21,15 +30,24 @@ __all__ = [
     "QUERY_ALLOWLIST",
     "get_query_template",
     "validate_query_id",
+    "validate_query_ids",
     "get_available_queries",
     "build_params",
     # Schema Registry
     "SCHEMA_REGISTRY",
+    "SCHEMA_COLUMNS",
     "SCHEMA_CONTEXT",
     "get_schema_context",
+    "find_columns",
     "get_table_info",
     "get_available_tables",
     "get_column_names",
+    "get_materialized_views",
+    "generate_materialized_views_sql",
+    "generate_fk_indexes",
+    "generate_filter_indexes",
+    "generate_indexes_sql",
     "TableInfo",
-    "ColumnInfo"
+    "ColumnInfo",
+    "MVSpec"
 ]
@@ -7,7 +7,9 @@ REGLAS DE SEGURIDAD:
 - Parametros validados
 - No SQL dinamico
 """
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Mapping, Optional
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import date, timedelta
 
 
@@ -515,17 +517,38 @@ def get_query_template(query_id: str) -> Optional[Dict[str, Any]]:
     return QUERY_ALLOWLIST.get(query_id)
 
 
+# Ids permitidos como frozenset: el allowlist es fijo en runtime
+_ALLOWED_IDS = frozenset(QUERY_ALLOWLIST)
+
+# Todos los ids son identificadores Python (lo verifica tests/test_sql_safety.py):
+# cualquier cosa con espacios, comillas, ';' o comentarios SQL se descarta
+# con isidentifier() sin consultar el set
+
+
 def validate_query_id(query_id: str) -> bool:
     """Valida que un query_id exista en el allowlist"""
-    return query_id in QUERY_ALLOWLIST
+    return isinstance(query_id, str) and query_id.isidentifier() and query_id in _ALLOWED_IDS
 
 
-def get_available_queries() -> Dict[str, str]:
-    """Retorna dict de query_id -> descripcion para el LLM"""
-    return {
+def validate_query_ids(query_ids: Iterable[str]) -> List[bool]:
+    """Valida varios query_ids en una pasada, un bool por id"""
+    allowed = _ALLOWED_IDS
+    return [
+        isinstance(query_id, str) and query_id.isidentifier() and query_id in allowed
+        for query_id in query_ids
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_available_queries() -> Mapping[str, str]:
+    """
+    Retorna query_id -> descripcion para el LLM.
+    Se construye una sola vez; vista de solo lectura porque se comparte entre requests.
+    """
+    return MappingProxyType({
         qid: q["description"]
         for qid, q in QUERY_ALLOWLIST.items()
-    }
+    })
 
 
 def build_params(query_id: str, user_params: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,358 @@
+"""
+Contexto de esquema pre-generado.
+
+ARCHIVO GENERADO por scripts/build_schema_context.py - no editar a mano.
+"""
+
+DOCS_SCHEMA_CONTEXT = (
+    '\n'
+    '## Contexto del Negocio\n'
+    '\n'
+    'Este sistema es para una **tienda de e-commerce** que vende principalmente en **MercadoLibre Argentina**.\n'
+    '\n'
+    '### Productos Principales:\n'
+    '- Accesorios automotrices (scanners OBD2, parasoles, fundas)\n'
+    '- Productos creativos (lapices 3D, marcadores, filamentos)\n'
+    '- Herramientas y accesorios varios\n'
+    '\n'
+    '### Canales de Venta:\n'
+    '- MercadoLibre (principal)\n'
+    '- Tienda propia (secundario)\n'
+    '\n'
+    '### Metricas Clave del Negocio:\n'
+    "- **Ventas**: Monto total facturado (solo ordenes con status='paid')\n"
+    '- **Ticket Promedio**: Monto promedio por orden\n'
+    '- **Unidades Vendidas**: Cantidad de productos vendidos\n'
+    '- **Tasa de Escalado**: % de conversaciones que requieren atencion humana\n'
+    '- **Stock Critico**: Productos con menos de 10 unidades\n'
+    '\n'
+    '### Flujo de Ordenes:\n'
+    '1. Cliente compra en MercadoLibre\n'
+    '2. Orden llega via webhook (status inicial varia)\n'
+    "3. Se procesa pago -> status='paid'\n"
+    "4. Se envia -> shipping_status='shipped'\n"
+    "5. Se entrega -> shipping_status='delivered'\n"
+    '\n'
+    '### Tipos de Envio (shipping_type):\n'
+    '- fulfillment: Mercado Envios Full (stock en deposito ML)\n'
+    '- cross_docking: Mercado Envios (seller envia a ML)\n'
+    '- drop_off: Punto de despacho\n'
+    '- self_service: Envio por cuenta propia\n'
+    '\n'
+    '\n'
+    '## Tablas Principales\n'
+    '\n'
+    '\n'
+    '### ml_orders\n'
+    '**Ordenes de venta de MercadoLibre. Tabla principal para metricas de ventas.**\n'
+    '\n'
+    '\n'
+    '            Esta tabla contiene TODAS las ordenes sincronizadas desde MercadoLibre.\n'
+    '\n'
+    '            IMPORTANTE para queries de ventas:\n'
+    "            - Filtrar por status='paid' para ventas efectivas\n"
+    '            - El campo total_amount es el monto final pagado por el cliente\n'
+    '            - date_created es la fecha de la orden (usar para filtros temporales)\n'
+    '            - Una orden puede tener multiples unidades (campo quantity)\n'
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID interno (PK)\n'
+    '- `order_id`: ID unico de MercadoLibre (bigint). Usar para referencias externas.\n'
+    '- `pack_id`: ID del pack si la orden es parte de un carrito multiple\n'
+    '- `buyer_id`: ID del comprador en MercadoLibre (FK a buyers)\n'
+    '- `buyer_nickname`: Nickname del comprador (ej: COMPRADOR123)\n'
+    '- `item_id`: ID del producto vendido (FK a ml_items)\n'
+    '- `item_title`: Titulo del producto al momento de la venta\n'
+    '- `item_sku`: SKU interno del producto\n'
+    '\n'
+    'Patrones de query:\n'
+    "- Ventas totales: SUM(total_amount) WHERE status='paid'\n"
+    "- Cantidad de ordenes: COUNT(*) WHERE status='paid'\n"
+    "- Ticket promedio: AVG(total_amount) WHERE status='paid'\n"
+    '\n'
+    '### ml_items\n'
+    '**Catalogo de productos publicados en MercadoLibre.**\n'
+    '\n'
+    '\n'
+    '            Contiene todos los productos activos y pausados del seller.\n'
+    '\n'
+    '            IMPORTANTE:\n'
+    '            - total_sold es el acumulado historico de unidades vendidas\n'
+    '            - available_quantity es el stock actual disponible\n'
+    '            - price es el precio actual (puede cambiar)\n'
+    '            - Para calcular revenue historico: price * total_sold\n'
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `item_id`: ID unico del producto en MercadoLibre (ej: MLA1234567890)\n'
+    '- `title`: Titulo del producto (max 60 chars para reportes)\n'
+    '- `permalink`: URL de la publicacion en MercadoLibre\n'
+    '- `thumbnail`: URL de la imagen miniatura\n'
+    '- `price`: Precio actual de venta\n'
+    '- `available_quantity`: Stock disponible. CRITICO si < 10.\n'
+    '- `status`: Estado: active, paused, closed\n'
+    '- `sku`: Codigo interno del producto\n'
+    '\n'
+    'Patrones de query:\n'
+    '- Top productos por revenue: ORDER BY (price * total_sold) DESC\n'
+    "- Stock bajo: WHERE available_quantity < 10 AND status='active'\n"
+    "- Productos activos: WHERE status='active'\n"
+    '\n'
+    '### buyers\n'
+    '**Informacion de compradores de MercadoLibre.**\n'
+    '\n'
+    'Datos de clientes para CRM y facturacion.\n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: ID del comprador en MercadoLibre (PK)\n'
+    '- `nickname`: Nickname publico del comprador\n'
+    '- `first_name`: Nombre\n'
+    '- `last_name`: Apellido\n'
+    '- `email`: Email (puede estar enmascarado por ML)\n'
+    '- `doc_type`: Tipo de documento (DNI, CUIT, etc)\n'
+    '- `doc_number`: Numero de documento\n'
+    '- `can_receive_factura_a`: Si puede recibir factura A (monotributista/RI)\n'
+    '\n'
+    '### agent_interactions\n'
+    '**Registro de TODAS las interacciones del agente AI con compradores.**\n'
+    '\n'
+    '\n'
+    '            Cada vez que el agente AI procesa un mensaje de un comprador,\n'
+    '            se guarda un registro aqui.\n'
+    '\n'
+    '            IMPORTANTE:\n'
+    '            - was_escalated=true indica que el agente no pudo resolver solo\n'
+    '            - case_type clasifica el tipo de consulta\n'
+    "            - source indica si es 'preventa' o 'postventa'\n"
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID de la interaccion\n'
+    '- `buyer_id`: ID del comprador\n'
+    '- `buyer_nickname`: Nickname del comprador\n'
+    '- `message_original`: Mensaje original del comprador\n'
+    '- `ai_response`: Respuesta generada por el agente AI\n'
+    '- `case_type`: Tipo de caso: envio, producto, devolucion, garantia, etc\n'
+    '- `was_escalated`: True si se escalo a humano\n'
+    '- `escalation_reason`: Motivo de escalado\n'
+    '\n'
+    'Patrones de query:\n'
+    '- Total interacciones: COUNT(*)\n'
+    '- Tasa de escalado: COUNT(*) FILTER (WHERE was_escalated) / COUNT(*)\n'
+    '- Por tipo de caso: GROUP BY case_type\n'
+    '\n'
+    '### escalations\n'
+    '**Casos escalados a atencion humana.**\n'
+    '\n'
+    '\n'
+    '            Cuando el agente AI no puede resolver un caso, lo escala aqui.\n'
+    '            El equipo humano debe atender estos casos priorizando por:\n'
+    '            1. priority (1=urgente, 5=normal, 10=bajo)\n'
+    '            2. created_at (mas antiguos primero)\n'
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID del escalado\n'
+    '- `buyer_id`: ID del comprador\n'
+    '- `buyer_nickname`: Nickname\n'
+    '- `buyer_name`: Nombre completo\n'
+    '- `pack_id`: ID del pack/carrito\n'
+    '- `order_id`: ID de la orden relacionada\n'
+    '- `message_original`: Mensaje original del comprador\n'
+    "- `reason`: Motivo del escalado (ej: 'cliente enojado', 'caso complejo')\n"
+    '\n'
+    'Patrones de query:\n'
+    "- Pendientes: WHERE status='pending' ORDER BY priority, created_at\n"
+    '- Resueltos hoy: WHERE resolved_at >= CURRENT_DATE\n'
+    '- Por tipo: GROUP BY case_type\n'
+    '\n'
+    '### conversations\n'
+    '**Conversaciones/hilos de chat con compradores.**\n'
+    '\n'
+    '\n'
+    '            Agrupa multiples mensajes en una conversacion.\n'
+    '            Una conversacion puede tener muchos mensajes.\n'
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID de la conversacion\n'
+    '- `buyer_id`: ID del comprador\n'
+    '- `pack_id`: ID del pack/carrito\n'
+    '- `status`: Estado: active, resolved, escalated\n'
+    '- `case_type`: Tipo de caso principal\n'
+    '- `message_count`: Cantidad de mensajes\n'
+    '- `first_message_at`: Primer mensaje\n'
+    '- `last_message_at`: Ultimo mensaje\n'
+    '\n'
+    '### messages\n'
+    '**Mensajes individuales dentro de conversaciones.**\n'
+    '\n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID del mensaje\n'
+    '- `conversation_id`: FK a conversations\n'
+    '- `sender_type`: Quien envio: buyer, agent, human\n'
+    '- `content`: Contenido del mensaje\n'
+    '- `created_at`: Fecha del mensaje\n'
+    '\n'
+    '### preventa_queries\n'
+    '**Preguntas de preventa de MercadoLibre.**\n'
+    '\n'
+    '\n'
+    '            Preguntas que hacen los usuarios ANTES de comprar.\n'
+    '            El agente AI puede responder automaticamente o escalar.\n'
+    '        \n'
+    '\n'
+    'Campos clave:\n'
+    '- `id`: UUID\n'
+    '- `question_id`: ID de la pregunta en MercadoLibre\n'
+    '- `item_id`: Producto sobre el que preguntan\n'
+    '- `buyer_id`: ID del comprador\n'
+    '- `question_text`: Pregunta del usuario\n'
+    '- `ai_response`: Respuesta del agente\n'
+    '- `status`: Estado: pending, answered, escalated\n'
+    '- `was_answered`: Si ya se respondio\n'
+    '\n'
+    '### ml_item_metrics\n'
+    '**Metricas calculadas de productos para alertas de stock.**\n'
+    '\n'
+    '\n'
+    'Campos clave:\n'
+    '- `item_id`: FK a ml_items\n'
+    '- `days_of_stock`: Dias estimados de stock restante\n'
+    '- `avg_daily_sales`: Promedio de ventas diarias\n'
+    '- `velocity`: Velocidad de venta: fast, medium, slow\n'
+    '- `reorder_point`: Punto de reorden sugerido\n'
+    '- `severity`: Severidad de alerta: critical, warning, ok'
+)
+
+REGISTRY_SCHEMA_CONTEXT = (
+    '# Database Schema\n'
+    '\n'
+    '## ml_items\n'
+    'Productos publicados en MercadoLibre. Contiene inventario, precios, y estadisticas de ventas.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| id (PK) | uuid | ID interno (UUID) |\n'
+    '| item_id | text | ID del item en MercadoLibre (ej: MLA123456) |\n'
+    '| title | text | Titulo del producto |\n'
+    '| sku | text | SKU/codigo interno del vendedor |\n'
+    '| price | numeric | Precio actual del producto |\n'
+    '| original_price | numeric | Precio original (sin descuento) |\n'
+    '| currency_id | text | Moneda (ARS, USD) |\n'
+    '| available_quantity | integer | Stock disponible para venta |\n'
+    '| sold_quantity | integer | Unidades vendidas (historico) |\n'
+    '| total_sold | integer | Total vendido (puede incluir variantes) |\n'
+    '| status | text | Estado: active, paused, closed, under_review |\n'
+    '| category_id | text | ID de categoria en ML |\n'
+    '| listing_type | text | Tipo: gold_special, gold_pro, etc |\n'
+    '| permalink | text | URL de la publicacion |\n'
+    '| thumbnail | text | URL de imagen principal |\n'
+    '| created_at | timestamptz | Fecha de creacion |\n'
+    '| updated_at | timestamptz | Ultima actualizacion |\n'
+    '\n'
+    '## ml_orders\n'
+    'Ordenes de compra de MercadoLibre. Cada fila es un item vendido (una orden puede tener multiples items).\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| id (PK) | uuid | ID interno (UUID) |\n'
+    '| order_id | bigint | ID de la orden en MercadoLibre |\n'
+    '| pack_id | bigint | ID del pack (si es compra multiple) |\n'
+    '| buyer_id | bigint | ID del comprador en ML |\n'
+    '| buyer_nickname | text | Nickname del comprador |\n'
+    '| item_id -> ml_items.item_id | text | ID del producto vendido |\n'
+    '| item_title | text | Titulo del producto al momento de la venta |\n'
+    '| sku | text | SKU del producto |\n'
+    '| quantity | integer | Cantidad comprada |\n'
+    '| unit_price | numeric | Precio unitario |\n'
+    '| total_amount | numeric | Monto total de la linea |\n'
+    '| currency_id | text | Moneda |\n'
+    '| status | text | Estado: paid, cancelled, pending |\n'
+    '| shipping_id | bigint | ID del envio |\n'
+    '| shipping_status | text | Estado del envio: delivered, shipped, pending |\n'
+    '| shipping_type | text | Tipo: mercadoenvios, custom, etc |\n'
+    '| date_created | timestamptz | Fecha de creacion de la orden |\n'
+    '| date_closed | timestamptz | Fecha de cierre |\n'
+    '| created_at | timestamptz | Fecha de registro en sistema |\n'
+    '\n'
+    '## conversations\n'
+    'Conversaciones con compradores. Cada fila es un thread de chat con un buyer.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| id (PK) | uuid | ID interno |\n'
+    '| pack_id | bigint | ID del pack/orden relacionado |\n'
+    '| buyer_id | bigint | ID del comprador |\n'
+    '| buyer_nickname | text | Nickname del comprador |\n'
+    '| status | text | Estado: active, closed, escalated |\n'
+    '| case_type | text | Tipo: postventa, preventa, reclamo, consulta |\n'
+    '| last_message_at | timestamptz | Fecha del ultimo mensaje |\n'
+    '| message_count | integer | Cantidad de mensajes |\n'
+    '| created_at | timestamptz | Inicio de la conversacion |\n'
+    '\n'
+    '## escalations\n'
+    'Casos escalados a atencion humana. El agente AI determino que requiere intervencion.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| id (PK) | uuid | ID interno |\n'
+    '| conversation_id -> conversations.id | uuid | ID de conversacion relacionada |\n'
+    '| pack_id | bigint | ID del pack/orden |\n'
+    '| buyer_id | bigint | ID del comprador |\n'
+    '| buyer_nickname | text | Nickname del comprador |\n'
+    '| buyer_message | text | Mensaje original del comprador |\n'
+    '| reason | text | Motivo de la escalacion |\n'
+    '| case_type | text | Tipo de caso: garantia, devolucion, factura, otro |\n'
+    '| status | text | Estado: pending, in_progress, resolved |\n'
+    '| priority | text | Prioridad: low, medium, high, urgent |\n'
+    '| source | text | Origen: postventa, preventa |\n'
+    '| assigned_to | text | Usuario asignado |\n'
+    '| resolution | text | Descripcion de la resolucion |\n'
+    '| created_at | timestamptz | Fecha de escalacion |\n'
+    '| resolved_at | timestamptz | Fecha de resolucion |\n'
+    '\n'
+    '## preventa_queries\n'
+    'Preguntas de preventa de compradores potenciales sobre productos.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| id (PK) | uuid | ID interno |\n'
+    '| question_id | bigint | ID de la pregunta en ML |\n'
+    '| item_id -> ml_items.item_id | text | ID del producto consultado |\n'
+    '| buyer_id | bigint | ID del comprador |\n'
+    '| buyer_nickname | text | Nickname del comprador |\n'
+    '| question | text | Texto de la pregunta |\n'
+    '| answer | text | Respuesta dada (si existe) |\n'
+    '| status | text | Estado: pending, answered |\n'
+    '| ai_suggested_answer | text | Respuesta sugerida por IA |\n'
+    '| created_at | timestamptz | Fecha de la pregunta |\n'
+    '| answered_at | timestamptz | Fecha de respuesta |\n'
+    '\n'
+    '## v_stock_dashboard\n'
+    'Vista calculada de stock con alertas. Incluye dias de cobertura y severidad.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| item_id | text | ID del producto |\n'
+    '| title | text | Titulo del producto |\n'
+    '| sku | text | SKU |\n'
+    '| available_quantity | integer | Stock actual |\n'
+    '| daily_avg_sales | numeric | Promedio de ventas diarias |\n'
+    '| days_cover | integer | Dias de cobertura de stock |\n'
+    '| severity | text | Severidad: critical, warning, ok |\n'
+    '| reorder_date | date | Fecha sugerida de reposicion |\n'
+    '\n'
+    '## mv_ml_orders_daily\n'
+    'Vista materializada de ventas diarias por estado (pre-agregada desde ml_orders, refresco cada hora). Preferir sobre ml_orders para totales por dia.\n'
+    '\n'
+    '| Column | Type | Description |\n'
+    '|--------|------|-------------|\n'
+    '| day | timestamptz | Dia (date_trunc de date_created) |\n'
+    '| status | text | Estado de la orden: paid, cancelled, pending |\n'
+    '| total_amount | numeric | Suma de total_amount del dia |\n'
+    '| units | bigint | Suma de unidades vendidas |\n'
+    '| order_count | bigint | Cantidad de ordenes |\n'
+)
@@ -9,6 +9,11 @@ El agente SQL debe usar esta documentacion para:
 2. Conocer el significado de cada campo
 3. Construir queries relevantes para las preguntas del usuario
 """
+from io import StringIO
+from itertools import islice
+from operator import itemgetter
+from types import MappingProxyType
+
 
 # ============================================================================
 # CONTEXTO DE NEGOCIO
@@ -53,7 +58,7 @@ Este sistema es para una **tienda de e-commerce** que vende principalmente en **
 # DOCUMENTACION DE TABLAS
 # ============================================================================
 
-SCHEMA_DOCUMENTATION = {
+_SCHEMA_DOCUMENTATION_MUT = {
     # ========== VENTAS Y ORDENES ==========
     "ml_orders": {
         "description": "Ordenes de venta de MercadoLibre. Tabla principal para metricas de ventas.",
@@ -91,7 +96,7 @@ SCHEMA_DOCUMENTATION = {
             "Ventas totales: SUM(total_amount) WHERE status='paid'",
             "Cantidad de ordenes: COUNT(*) WHERE status='paid'",
             "Ticket promedio: AVG(total_amount) WHERE status='paid'",
-            "Ventas por dia: GROUP BY DATE(date_created)"
+            "Ventas por dia: GROUP BY date_trunc('day', date_created)"
         ]
     },
 
@@ -281,33 +286,57 @@ SCHEMA_DOCUMENTATION = {
     }
 }
 
+# Vista de solo lectura: la documentacion es estatica y compartida
+SCHEMA_DOCUMENTATION = MappingProxyType(_SCHEMA_DOCUMENTATION_MUT)
+
 # ============================================================================
 # FUNCIONES DE AYUDA
 # ============================================================================
 
+# Claves presentes en todas las tablas documentadas
+_get_required = itemgetter("description", "fields")
+
+
 def get_schema_context() -> str:
     """
     Genera el contexto de esquema para el system prompt del agente.
     """
-    context = [BUSINESS_CONTEXT, "\n## Tablas Principales\n"]
+    buf = StringIO()
+    w = buf.write
+    w(BUSINESS_CONTEXT)
+    w("\n\n## Tablas Principales\n")
 
     for table_name, table_info in SCHEMA_DOCUMENTATION.items():
-        context.append(f"\n### {table_name}")
-        context.append(f"**{table_info['description']}**\n")
+        description, fields = _get_required(table_info)
+        business_context = table_info.get("business_context")
+        common_queries = table_info.get("common_queries")
+
+        w(f"\n\n### {table_name}")
+        w(f"\n**{description}**\n")
 
-        if "business_context" in table_info:
-            context.append(table_info["business_context"])
+        if business_context is not None:
+            w("\n" + business_context)
 
-        context.append("\nCampos clave:")
-        for field, desc in list(table_info["fields"].items())[:8]:  # Top 8 campos
-            context.append(f"- `{field}`: {desc}")
+        w("\n\nCampos clave:")
+        for field, desc in islice(fields.items(), 8):  # Top 8 campos
+            w(f"\n- `{field}`: {desc}")
 
-        if "common_queries" in table_info:
-            context.append("\nPatrones de query:")
-            for q in table_info["common_queries"][:3]:
-                context.append(f"- {q}")
+        if common_queries is not None:
+            w("\n\nPatrones de query:")
+            for q in common_queries[:3]:
+                w(f"\n- {q}")
 
-    return "\n".join(context)
+    return buf.getvalue()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estima la cantidad de tokens de un texto (~4 caracteres por token).
+
+    Aproximacion independiente del modelo: alcanza para reservar presupuesto
+    de contexto sin tokenizar en cada request.
+    """
+    return (len(text) + 3) // 4
 
 
 def get_table_documentation(table_name: str) -> dict:
@@ -325,4 +354,11 @@ def get_all_tables() -> list:
 
 
 # Exportar contexto pre-generado para uso rapido
-SCHEMA_CONTEXT = get_schema_context()
+# (literal generado por scripts/build_schema_context.py)
+try:
+    from .schema_context_generated import DOCS_SCHEMA_CONTEXT as SCHEMA_CONTEXT
+except ImportError:
+    SCHEMA_CONTEXT = get_schema_context()
+
+# Tokens aproximados del contexto, calculados una sola vez
+SCHEMA_CONTEXT_TOKEN_COUNT = estimate_tokens(SCHEMA_CONTEXT)
@@ -4,7 +4,10 @@ Schema Registry - Database schema descriptions for SQL Specialist Agent
 Provides detailed metadata about tables, columns, and relationships
 for the LLM to understand the data structure.
 """
-from typing import Dict, Any, List
+import re
+from io import StringIO
+from types import MappingProxyType
+from typing import Dict, Any, Iterable, List, Mapping, Optional, Tuple
 from dataclasses import dataclass, field
 
 
@@ -18,6 +21,20 @@ class ColumnInfo:
     is_primary_key: bool = False
     foreign_key: str = None  # "table.column" format
 
+    @property
+    def is_temporal(self) -> bool:
+        """True for timestamp columns (candidates for date_trunc grouping)"""
+        return self.type in ("timestamptz", "timestamp")
+
+
+@dataclass
+class MVSpec:
+    """Materialized view pre-aggregating a base table"""
+    name: str
+    sql: str
+    unique_key: List[str] = field(default_factory=list)  # Required for REFRESH ... CONCURRENTLY
+    refresh_interval: str = "1 hour"
+
 
 @dataclass
 class TableInfo:
@@ -26,13 +43,16 @@ class TableInfo:
     description: str
     columns: List[ColumnInfo] = field(default_factory=list)
     sample_queries: List[str] = field(default_factory=list)
+    materialized_views: List[MVSpec] = field(default_factory=list)
+    is_view: bool = False
+    prefetch_with: Tuple[str, ...] = ()  # Tables usually joined with this one
 
 
 # =============================================================================
 # DATABASE SCHEMA REGISTRY
 # =============================================================================
 
-SCHEMA_REGISTRY: Dict[str, TableInfo] = {
+_SCHEMA_REGISTRY_MUT: Dict[str, TableInfo] = {
 
     # =========================================================================
     # MERCADOLIBRE TABLES
@@ -75,7 +95,7 @@ SCHEMA_REGISTRY: Dict[str, TableInfo] = {
             ColumnInfo("pack_id", "bigint", "ID del pack (si es compra multiple)"),
             ColumnInfo("buyer_id", "bigint", "ID del comprador en ML"),
             ColumnInfo("buyer_nickname", "text", "Nickname del comprador"),
-            ColumnInfo("item_id", "text", "ID del producto vendido"),
+            ColumnInfo("item_id", "text", "ID del producto vendido", foreign_key="ml_items.item_id"),
             ColumnInfo("item_title", "text", "Titulo del producto al momento de la venta"),
             ColumnInfo("sku", "text", "SKU del producto"),
             ColumnInfo("quantity", "integer", "Cantidad comprada"),
@@ -93,6 +113,20 @@ SCHEMA_REGISTRY: Dict[str, TableInfo] = {
         sample_queries=[
             "SELECT SUM(total_amount) as total FROM ml_orders WHERE status = 'paid'",
             "SELECT DATE(date_created), SUM(total_amount) FROM ml_orders GROUP BY 1",
+        ],
+        prefetch_with=("ml_items",),
+        materialized_views=[
+            MVSpec(
+                name="mv_ml_orders_daily",
+                sql=(
+                    "SELECT date_trunc('day', date_created) AS day, status, "
+                    "SUM(total_amount) AS total_amount, SUM(quantity) AS units, "
+                    "COUNT(*) AS order_count "
+                    "FROM ml_orders GROUP BY 1, 2"
+                ),
+                unique_key=["day", "status"],
+                refresh_interval="1 hour",
+            ),
         ]
     ),
 
@@ -117,7 +151,8 @@ SCHEMA_REGISTRY: Dict[str, TableInfo] = {
         sample_queries=[
             "SELECT status, COUNT(*) FROM conversations GROUP BY status",
             "SELECT * FROM conversations WHERE status = 'active' ORDER BY last_message_at DESC",
-        ]
+        ],
+        prefetch_with=("escalations",)
     ),
 
     "escalations": TableInfo(
@@ -152,7 +187,7 @@ SCHEMA_REGISTRY: Dict[str, TableInfo] = {
         columns=[
             ColumnInfo("id", "uuid", "ID interno", is_primary_key=True),
             ColumnInfo("question_id", "bigint", "ID de la pregunta en ML"),
-            ColumnInfo("item_id", "text", "ID del producto consultado"),
+            ColumnInfo("item_id", "text", "ID del producto consultado", foreign_key="ml_items.item_id"),
             ColumnInfo("buyer_id", "bigint", "ID del comprador"),
             ColumnInfo("buyer_nickname", "text", "Nickname del comprador"),
             ColumnInfo("question", "text", "Texto de la pregunta"),
@@ -187,10 +222,37 @@ SCHEMA_REGISTRY: Dict[str, TableInfo] = {
         ],
         sample_queries=[
             "SELECT * FROM v_stock_dashboard WHERE severity = 'critical'",
-        ]
+        ],
+        is_view=True
+    ),
+
+    "mv_ml_orders_daily": TableInfo(
+        name="mv_ml_orders_daily",
+        description="Vista materializada de ventas diarias por estado (pre-agregada desde ml_orders, refresco cada hora). Preferir sobre ml_orders para totales por dia.",
+        columns=[
+            ColumnInfo("day", "timestamptz", "Dia (date_trunc de date_created)"),
+            ColumnInfo("status", "text", "Estado de la orden: paid, cancelled, pending"),
+            ColumnInfo("total_amount", "numeric", "Suma de total_amount del dia"),
+            ColumnInfo("units", "bigint", "Suma de unidades vendidas"),
+            ColumnInfo("order_count", "bigint", "Cantidad de ordenes"),
+        ],
+        sample_queries=[
+            "SELECT day, total_amount FROM mv_ml_orders_daily WHERE status = 'paid' ORDER BY day",
+        ],
+        is_view=True
     ),
 }
 
+# Read-only view: the registry is static and shared by every request
+SCHEMA_REGISTRY: Mapping[str, TableInfo] = MappingProxyType(_SCHEMA_REGISTRY_MUT)
+
+# Flat (table_name, column) rows for cross-table column queries
+SCHEMA_COLUMNS: Tuple[Tuple[str, ColumnInfo], ...] = tuple(
+    (table_name, col)
+    for table_name, table in SCHEMA_REGISTRY.items()
+    for col in table.columns
+)
+
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -203,22 +265,145 @@ def get_schema_context() -> str:
     Returns:
         str: Formatted schema description
     """
-    lines = ["# Database Schema\n"]
+    buf = StringIO()
+    w = buf.write
+    w("# Database Schema\n")
 
     for table_name, table in SCHEMA_REGISTRY.items():
-        lines.append(f"## {table_name}")
-        lines.append(f"{table.description}\n")
-        lines.append("| Column | Type | Description |")
-        lines.append("|--------|------|-------------|")
+        w(f"\n## {table_name}")
+        w(f"\n{table.description}\n")
+        w("\n| Column | Type | Description |")
+        w("\n|--------|------|-------------|")
 
         for col in table.columns:
             pk = " (PK)" if col.is_primary_key else ""
             fk = f" -> {col.foreign_key}" if col.foreign_key else ""
-            lines.append(f"| {col.name}{pk}{fk} | {col.type} | {col.description} |")
+            w(f"\n| {col.name}{pk}{fk} | {col.type} | {col.description} |")
+
+        w("\n")
+
+    return buf.getvalue()
+
+
+def get_materialized_views() -> List[MVSpec]:
+    """Get all materialized view specs declared in the registry"""
+    return [mv for table in SCHEMA_REGISTRY.values() for mv in table.materialized_views]
+
+
+def generate_materialized_views_sql() -> str:
+    """
+    Generate the DDL for every materialized view in the registry.
+
+    Output is the body of migrations/003_materialized_views.sql.
+    """
+    buf = StringIO()
+    w = buf.write
+
+    for mv in get_materialized_views():
+        w(f"\n-- {mv.name} (refresh every {mv.refresh_interval})\n")
+        w(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {mv.name} AS\n{mv.sql};\n")
+        if mv.unique_key:
+            w(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{mv.name}_key "
+                f"ON {mv.name} ({', '.join(mv.unique_key)});\n"
+            )
+
+    return buf.getvalue()
+
+
+# Columns filtered or grouped by in sample_queries are index candidates
+_FILTER_COLUMN_RE = re.compile(r"\b(?:WHERE|AND)\s+(\w+)\s*=|\bGROUP BY\s+(\w+)", re.IGNORECASE)
+
+
+def _index_ddl(table_name: str, column_name: str) -> str:
+    return f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{column_name} ON {table_name} ({column_name});"
+
+
+def generate_fk_indexes() -> List[str]:
+    """Generate CREATE INDEX statements for every foreign key column"""
+    return [
+        _index_ddl(table_name, col.name)
+        for table_name, col in SCHEMA_COLUMNS
+        if col.foreign_key and not SCHEMA_REGISTRY[table_name].is_view
+    ]
+
+
+def generate_filter_indexes() -> List[str]:
+    """Generate CREATE INDEX statements for columns filtered/grouped in sample_queries"""
+    statements = []
+
+    for table_name, table in SCHEMA_REGISTRY.items():
+        if table.is_view:
+            continue
+
+        indexable = {col.name for col in table.columns if not col.is_primary_key}
+        for query in table.sample_queries:
+            for match in _FILTER_COLUMN_RE.finditer(query):
+                column_name = match.group(1) or match.group(2)
+                if column_name in indexable:
+                    statements.append(_index_ddl(table_name, column_name))
+
+    return statements
+
+
+def generate_indexes_sql() -> str:
+    """
+    Generate index DDL for FK and filter columns, without duplicates.
+
+    Output is the body of migrations/004_auto_indexes.sql.
+    """
+    statements = dict.fromkeys(generate_fk_indexes() + generate_filter_indexes())
+    return "".join(f"{stmt}\n" for stmt in statements)
+
+
+def _join_condition(table_name: str, other_name: str) -> Optional[str]:
+    """Build the ON clause between two tables from their declared foreign keys"""
+    for source, target in ((table_name, other_name), (other_name, table_name)):
+        for col in SCHEMA_REGISTRY[source].columns:
+            if col.foreign_key and col.foreign_key.split(".", 1)[0] == target:
+                return f"{source}.{col.name} = {col.foreign_key}"
+    return None
+
+
+def build_prefetch_joins(table_name: str, projection: Iterable[str]) -> List[str]:
+    """
+    Build LEFT JOIN clauses for prefetch_with tables referenced in a projection.
+
+    Not wired into query execution yet: only allowlisted templates run, so
+    there is no SQL builder to call this. Kept out of app.sql's public API
+    until one exists.
+
+    Args:
+        table_name: Base table of the SELECT
+        projection: Selected columns, qualified as "table.column"
+
+    Returns:
+        List[str]: One "LEFT JOIN ..." clause per referenced related table
+    """
+    table = SCHEMA_REGISTRY.get(table_name)
+    if not table:
+        return []
+
+    referenced = {col.split(".", 1)[0] for col in projection if "." in col}
+    joins = []
+    for other_name in table.prefetch_with:
+        if other_name not in referenced:
+            continue
+        condition = _join_condition(table_name, other_name)
+        if condition:
+            joins.append(f"LEFT JOIN {other_name} ON {condition}")
+
+    return joins
 
-        lines.append("")
 
-    return "\n".join(lines)
+def find_columns(col_type: Optional[str] = None, nullable: Optional[bool] = None) -> List[Tuple[str, ColumnInfo]]:
+    """Find (table_name, column) pairs across all tables matching the given filters"""
+    return [
+        (table_name, col)
+        for table_name, col in SCHEMA_COLUMNS
+        if (col_type is None or col.type == col_type)
+        and (nullable is None or col.nullable == nullable)
+    ]
 
 
 def get_table_info(table_name: str) -> TableInfo:
@@ -239,5 +424,9 @@ def get_column_names(table_name: str) -> List[str]:
     return [col.name for col in table.columns]
 
 
-# Pre-generate schema context for embedding in prompts
-SCHEMA_CONTEXT = get_schema_context()
+# Pre-generated schema context for embedding in prompts
+# (literal built by scripts/build_schema_context.py)
+try:
+    from .schema_context_generated import REGISTRY_SCHEMA_CONTEXT as SCHEMA_CONTEXT
+except ImportError:
+    SCHEMA_CONTEXT = get_schema_context()
@@ -13,6 +13,7 @@ Ejemplos:
 """
 import re
 from datetime import date, timedelta
+from functools import lru_cache
 from typing import Tuple, Optional, NamedTuple, List
 from calendar import monthrange
 from dataclasses import dataclass
@@ -36,7 +37,7 @@ SPANISH_MONTHS = {
 
 # Patrones para detectar comparaciones
 COMPARISON_PATTERNS = [
-    r'\bvs\.?\b',
+    r'\bvs\.?(?!\w)',
     r'\bversus\b',
     r'\bcontra\b',
     r'\bcomparado?\s+con\b',
@@ -60,6 +61,18 @@ class ComparisonDateRange:
     current_period: DatePeriod
     previous_period: Optional[DatePeriod] = None
 
+# Sin acentos: los patrones se escriben solo en ASCII
+_ACCENT_TABLE = str.maketrans("áéíóúüñ", "aeiouun")
+
+# Paso de un dia (date_to es exclusivo)
+_ONE_DAY = timedelta(days=1)
+
+# Nombres de mes para mostrar al LLM (indice = numero de mes)
+_MONTH_NAMES_ES = (
+    None, "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre",
+)
+
 # Mapeo de trimestres
 QUARTERS = {
     "q1": (1, 3), "primer trimestre": (1, 3), "1er trimestre": (1, 3),
@@ -68,22 +81,184 @@ QUARTERS = {
     "q4": (10, 12), "cuarto trimestre": (10, 12), "4to trimestre": (10, 12),
 }
 
+# ============================================================================
+# PATRONES PRECOMPILADOS
+# ============================================================================
+
+# Alternativas ordenadas por longitud desc: "septiembre" antes que "sept" y "sep"
+_MONTH_ALT = '|'.join(sorted(SPANISH_MONTHS, key=len, reverse=True))
+_QUARTER_ALT = '|'.join(map(re.escape, sorted(QUARTERS, key=len, reverse=True)))
+
+# Cualquier nombre de mes como substring (sin limites de palabra)
+_ANY_MONTH_RE = re.compile('|'.join(map(re.escape, SPANISH_MONTHS)))
+_RE_ANO_WORD = re.compile(r'\b(ano|year)\b')
+
+# Comparaciones
+# Mes con año opcional ("dic", "dic 2024", "dic de 2024")
+_MONTH_TEXT_ALT = re.compile(rf'\b({_MONTH_ALT})\s*(?:de\s+)?(\d{{4}})?\b')
+# Deteccion y division de comparaciones con una sola alternativa
+_COMPARISON_RE = re.compile(r'\s*(?:' + '|'.join(COMPARISON_PATTERNS) + r')\s*')
+
+
+def _normalize_question(question: str) -> str:
+    """Minusculas, sin acentos y con espacios simples."""
+    return ' '.join(question.lower().split()).translate(_ACCENT_TABLE)
+
 
+def _previous_month(month: int, year: int) -> Tuple[int, int]:
+    """(mes, año) del mes anterior."""
+    if month == 1:
+        return 12, year - 1
+    return month - 1, year
+
+
+@lru_cache(maxsize=256)
 def _get_month_range(year: int, month: int) -> Tuple[str, str]:
     """Retorna el rango de fechas para un mes completo."""
     first_day = date(year, month, 1)
     last_day_num = monthrange(year, month)[1]
     last_day = date(year, month, last_day_num)
     # date_to es exclusivo, asi que sumamos 1 dia
-    return first_day.isoformat(), (last_day + timedelta(days=1)).isoformat()
+    return first_day.isoformat(), (last_day + _ONE_DAY).isoformat()
 
 
+@lru_cache(maxsize=256)
 def _get_quarter_range(year: int, quarter_start: int, quarter_end: int) -> Tuple[str, str]:
     """Retorna el rango de fechas para un trimestre."""
     first_day = date(year, quarter_start, 1)
     last_day_num = monthrange(year, quarter_end)[1]
     last_day = date(year, quarter_end, last_day_num)
-    return first_day.isoformat(), (last_day + timedelta(days=1)).isoformat()
+    return first_day.isoformat(), (last_day + _ONE_DAY).isoformat()
+
+
+# ============================================================================
+# HANDLERS DE extract_date_range (match, pregunta, hoy, found) -> rango o None
+# found: primer match de cada regla, para reusar capturas de otras reglas
+# ============================================================================
+
+def _on_hoy(m, q, today, found):
+    return today.isoformat(), (today + _ONE_DAY).isoformat()
+
+
+def _on_ayer(m, q, today, found):
+    yesterday = today - _ONE_DAY
+    return yesterday.isoformat(), today.isoformat()
+
+
+def _on_esta_semana(m, q, today, found):
+    # Lunes de esta semana
+    start_of_week = today - timedelta(days=today.weekday())
+    end_of_week = start_of_week + timedelta(days=7)
+    return start_of_week.isoformat(), end_of_week.isoformat()
+
+
+def _on_semana_pasada(m, q, today, found):
+    start_of_last_week = today - timedelta(days=today.weekday() + 7)
+    end_of_last_week = start_of_last_week + timedelta(days=7)
+    return start_of_last_week.isoformat(), end_of_last_week.isoformat()
+
+
+def _on_este_mes(m, q, today, found):
+    return _get_month_range(today.year, today.month)
+
+
+def _on_mes_pasado(m, q, today, found):
+    month, year = _previous_month(today.month, today.year)
+    return _get_month_range(year, month)
+
+
+def _on_ultimos_dias(m, q, today, found):
+    start = today - timedelta(days=int(m.group('ud_days')))
+    return start.isoformat(), (today + _ONE_DAY).isoformat()
+
+
+def _on_ultimas_semanas(m, q, today, found):
+    start = today - timedelta(weeks=int(m.group('us_weeks')))
+    return start.isoformat(), (today + _ONE_DAY).isoformat()
+
+
+def _on_month_year(m, q, today, found):
+    # "diciembre 2024" o "diciembre de 2024"
+    return _get_month_range(int(m.group('my_year')), SPANISH_MONTHS[m.group('my_month')])
+
+
+def _on_month(m, q, today, found):
+    # "diciembre" o "en diciembre" (sin año - usa año actual)
+    return _get_month_range(today.year, SPANISH_MONTHS[m.group('m_month')])
+
+
+def _on_year(m, q, today, found):
+    # "2024" solo (ano completo) - solo si mencionan "ano" o "year" y ningun mes
+    if _ANY_MONTH_RE.search(q) or not _RE_ANO_WORD.search(q):
+        return None
+    year = int(m.group('y_year'))
+    return f"{year}-01-01", f"{year + 1}-01-01"
+
+
+def _on_quarter(m, q, today, found):
+    # "Q4 2024", "cuarto trimestre 2024"
+    q_start, q_end = QUARTERS[m.group('q_name')]
+    return _get_quarter_range(int(m.group('q_year')), q_start, q_end)
+
+
+def _on_day_or_range(m, q, today, found):
+    # "del 1 al 15 de diciembre 2024" o "15 de diciembre 2024" (dia especifico)
+    month_num = SPANISH_MONTHS.get(m.group('d_month'))
+    day = int(m.group('d_day'))
+    if month_num is None or not 1 <= day <= 31:
+        return None
+    year = int(m.group('d_year')) if m.group('d_year') else today.year
+    try:
+        last_day = date(year, month_num, day)
+        # Con "del N al" el rango empieza en N; si no, es un solo dia
+        start = date(year, month_num, int(m.group('r_start'))) if m.group('r_start') else last_day
+    except ValueError:
+        return None  # Dia invalido para el mes
+    return start.isoformat(), (last_day + _ONE_DAY).isoformat()
+
+
+def _on_cyber(m, q, today, found):
+    # "cyber monday" / "black friday" - Retornamos todo noviembre para ser inclusivos
+    # Reusa el primer año que encontro el escaneo en vez de buscarlo de nuevo
+    year_match = found.get('year')
+    year = int(year_match.group('y_year')) if year_match else today.year
+    return _get_month_range(year, 11)
+
+
+# Reglas de extract_date_range: (nombre, patron, handler) en orden de
+# prioridad (la primera que resuelve gana). Todos los patrones empiezan al
+# inicio de una palabra (el \b va en _DATE_RE) y sus subgrupos tienen nombre
+# propio para poder combinarlos en una sola expresion.
+_DATE_RULES = [
+    # Relativos
+    ("hoy", r'hoy\b', _on_hoy),
+    ("ayer", r'ayer\b', _on_ayer),
+    ("esta_semana", r'esta\s+semana\b', _on_esta_semana),
+    ("semana_pasada", r'(?:semana\s+pasada|ultimas?\s+semana)\b', _on_semana_pasada),
+    ("este_mes", r'este\s+mes\b', _on_este_mes),
+    ("mes_pasado", r'(?:mes\s+pasado|ultimo\s+mes)\b', _on_mes_pasado),
+    ("ultimos_dias", r'ultimos?\s+(?P<ud_days>\d+)\s+dias?\b', _on_ultimos_dias),
+    ("ultimas_semanas", r'ultimas?\s+(?P<us_weeks>\d+)\s+semanas?\b', _on_ultimas_semanas),
+    # Absolutos
+    ("month_year", rf'(?P<my_month>{_MONTH_ALT})\s+(?:de\s+)?(?P<my_year>\d{{4}})\b', _on_month_year),
+    ("month", rf'(?:en\s+)?(?P<m_month>{_MONTH_ALT})\b(?!\s*(?:de\s+)?\d{{4}})', _on_month),
+    ("year", r'(?P<y_year>20\d{2})\b', _on_year),
+    ("quarter", rf'(?P<q_name>{_QUARTER_ALT})\s+(?:de\s+)?(?P<q_year>\d{{4}})\b', _on_quarter),
+    ("day_or_range",
+     r'(?:del?\s+(?P<r_start>\d{1,2})\s+al?\s+)?(?P<d_day>\d{1,2})\s+de\s+(?P<d_month>[a-z]+)(?:\s+(?:de\s+)?(?P<d_year>\d{4}))?\b',
+     _on_day_or_range),
+    # Eventos especiales
+    ("cyber", r'(?:cyber\s*monday|black\s*friday)\b', _on_cyber),
+]
+
+# Un solo automata para todas las reglas. Cada alternativa va dentro de un
+# lookahead para que los matches no consuman texto: asi finditer reporta todos
+# los patrones presentes en una sola pasada y la prioridad se decide despues.
+# El prefijo comun \b(?=\w) limita los intentos al inicio de cada palabra.
+_DATE_RE = re.compile(
+    r'\b(?=\w)(?:' + '|'.join(f'(?=(?P<{name}>{pattern}))' for name, pattern, _ in _DATE_RULES) + ')'
+)
+_DATE_HANDLERS = {name: handler for name, _, handler in _DATE_RULES}
 
 
 def extract_date_range(question: str) -> Tuple[Optional[str], Optional[str]]:
@@ -106,142 +281,38 @@ def extract_date_range(question: str) -> Tuple[Optional[str], Optional[str]]:
         >>> extract_date_range("hola como estas")
         (None, None)
     """
-    q = question.lower().strip()
-    today = date.today()
-
-    # === PATRONES RELATIVOS ===
-
-    # "hoy"
-    if re.search(r'\bhoy\b', q):
-        return today.isoformat(), (today + timedelta(days=1)).isoformat()
-
-    # "ayer"
-    if re.search(r'\bayer\b', q):
-        yesterday = today - timedelta(days=1)
-        return yesterday.isoformat(), today.isoformat()
-
-    # "esta semana"
-    if re.search(r'\besta\s+semana\b', q):
-        # Lunes de esta semana
-        start_of_week = today - timedelta(days=today.weekday())
-        end_of_week = start_of_week + timedelta(days=7)
-        return start_of_week.isoformat(), end_of_week.isoformat()
-
-    # "semana pasada" / "ultima semana"
-    if re.search(r'\b(semana\s+pasada|ultima\s+semana|últimas?\s+semana)\b', q):
-        start_of_last_week = today - timedelta(days=today.weekday() + 7)
-        end_of_last_week = start_of_last_week + timedelta(days=7)
-        return start_of_last_week.isoformat(), end_of_last_week.isoformat()
-
-    # "este mes"
-    if re.search(r'\beste\s+mes\b', q):
-        return _get_month_range(today.year, today.month)
-
-    # "mes pasado" / "ultimo mes"
-    if re.search(r'\b(mes\s+pasado|ultimo\s+mes|último\s+mes)\b', q):
-        if today.month == 1:
-            return _get_month_range(today.year - 1, 12)
-        else:
-            return _get_month_range(today.year, today.month - 1)
-
-    # "ultimos N dias"
-    match = re.search(r'\b[uú]ltimos?\s+(\d+)\s+d[ií]as?\b', q)
-    if match:
-        days = int(match.group(1))
-        start = today - timedelta(days=days)
-        return start.isoformat(), (today + timedelta(days=1)).isoformat()
+    # El ordinal de hoy es parte de la clave: el cache se renueva cada dia
+    q = _normalize_question(question)
+    return _extract_date_range_cached(q, date.today().toordinal())
 
-    # "ultimas N semanas"
-    match = re.search(r'\b[uú]ltimas?\s+(\d+)\s+semanas?\b', q)
-    if match:
-        weeks = int(match.group(1))
-        start = today - timedelta(weeks=weeks)
-        return start.isoformat(), (today + timedelta(days=1)).isoformat()
 
-    # === PATRONES ABSOLUTOS ===
+@lru_cache(maxsize=4096)
+def _extract_date_range_cached(q: str, today_ordinal: int) -> Tuple[Optional[str], Optional[str]]:
+    """Resuelve el rango de una pregunta ya normalizada para el dia dado."""
+    today = date.fromordinal(today_ordinal)
 
-    # "diciembre 2024" o "diciembre de 2024" (con año explícito)
-    for month_name, month_num in SPANISH_MONTHS.items():
-        pattern = rf'\b{month_name}\s+(?:de\s+)?(\d{{4}})\b'
-        match = re.search(pattern, q)
-        if match:
-            year = int(match.group(1))
-            return _get_month_range(year, month_num)
+    # Primer match de cada patron, en una sola pasada
+    found = {}
+    for match in _DATE_RE.finditer(q):
+        found.setdefault(match.lastgroup, match)
 
-    # "diciembre" o "en diciembre" (sin año - usa año actual)
-    for month_name, month_num in SPANISH_MONTHS.items():
-        pattern = rf'\b(?:en\s+)?{month_name}\b'
-        match = re.search(pattern, q)
-        if match:
-            # Verificar que no haya un año después (ya manejado arriba)
-            after_match = q[match.end():]
-            if not re.match(r'\s*(?:de\s+)?\d{4}', after_match):
-                return _get_month_range(today.year, month_num)
-
-    # "2024" solo (ano completo) - solo si es el unico numero de 4 digitos
-    match = re.search(r'\b(20\d{2})\b', q)
-    if match and not any(m in q for m in SPANISH_MONTHS.keys()):
-        # Verificar que no sea parte de otra expresion
-        year = int(match.group(1))
-        # Solo si mencionan "ano" o "year"
-        if re.search(r'\b(a[ñn]o|year)\b', q):
-            return f"{year}-01-01", f"{year + 1}-01-01"
-
-    # Trimestres: "Q4 2024", "cuarto trimestre 2024"
-    for quarter_name, (q_start, q_end) in QUARTERS.items():
-        pattern = rf'\b{quarter_name}\s+(?:de\s+)?(\d{{4}})\b'
-        match = re.search(pattern, q)
+    for name, handler in _DATE_HANDLERS.items():
+        match = found.get(name)
         if match:
-            year = int(match.group(1))
-            return _get_quarter_range(year, q_start, q_end)
-
-    # "del 1 al 15 de diciembre 2024"
-    pattern = r'\bdel?\s+(\d{1,2})\s+al?\s+(\d{1,2})\s+de\s+(\w+)(?:\s+(?:de\s+)?(\d{4}))?\b'
-    match = re.search(pattern, q)
-    if match:
-        day_start = int(match.group(1))
-        day_end = int(match.group(2))
-        month_name = match.group(3).lower()
-        year = int(match.group(4)) if match.group(4) else today.year
-
-        if month_name in SPANISH_MONTHS:
-            month_num = SPANISH_MONTHS[month_name]
-            start = date(year, month_num, day_start)
-            end = date(year, month_num, day_end) + timedelta(days=1)
-            return start.isoformat(), end.isoformat()
-
-    # "15 de diciembre" o "15 de diciembre 2024" (dia especifico)
-    pattern = r'\b(\d{1,2})\s+de\s+(\w+)(?:\s+(?:de\s+)?(\d{4}))?\b'
-    match = re.search(pattern, q)
-    if match:
-        day = int(match.group(1))
-        month_name = match.group(2).lower()
-        year = int(match.group(3)) if match.group(3) else today.year
-
-        if month_name in SPANISH_MONTHS and 1 <= day <= 31:
-            month_num = SPANISH_MONTHS[month_name]
-            try:
-                specific_date = date(year, month_num, day)
-                return specific_date.isoformat(), (specific_date + timedelta(days=1)).isoformat()
-            except ValueError:
-                pass  # Dia invalido para el mes
-
-    # === EVENTOS ESPECIALES ===
-
-    # "cyber monday" / "black friday" - asumimos fechas tipicas de noviembre
-    if re.search(r'\b(cyber\s*monday|black\s*friday)\b', q):
-        # Buscar ano en la pregunta
-        year_match = re.search(r'\b(20\d{2})\b', q)
-        year = int(year_match.group(1)) if year_match else today.year
-        # Cyber Monday/Black Friday suele ser ultima semana de noviembre
-        # Retornamos todo noviembre para ser inclusivos
-        return _get_month_range(year, 11)
+            result = handler(match, q, today, found)
+            if result:
+                return result
 
     # === FALLBACK ===
     # Si no encontramos fechas especificas, retornamos None
     return None, None
 
+def _format_dmy(d: date) -> str:
+    """dd/mm/yyyy sin pasar por strftime."""
+    return f"{d.day:02d}/{d.month:02d}/{d.year}"
+
 
+@lru_cache(maxsize=1024)
 def format_date_context(date_from: Optional[str], date_to: Optional[str]) -> str:
     """
     Formatea el contexto de fechas para mostrar al LLM.
@@ -258,26 +329,21 @@ def format_date_context(date_from: Optional[str], date_to: Optional[str]) -> str
 
     try:
         d_from = date.fromisoformat(date_from)
-        d_to = date.fromisoformat(date_to) - timedelta(days=1)  # Ajustar exclusividad
+        d_to = date.fromisoformat(date_to) - _ONE_DAY  # Ajustar exclusividad
 
         # Mismo dia
         if d_from == d_to:
-            return f"{d_from.strftime('%d/%m/%Y')}"
+            return _format_dmy(d_from)
 
         # Mismo mes
         if d_from.year == d_to.year and d_from.month == d_to.month:
             if d_from.day == 1 and d_to.day == monthrange(d_to.year, d_to.month)[1]:
                 # Mes completo
-                month_names = {
-                    1: "enero", 2: "febrero", 3: "marzo", 4: "abril",
-                    5: "mayo", 6: "junio", 7: "julio", 8: "agosto",
-                    9: "septiembre", 10: "octubre", 11: "noviembre", 12: "diciembre"
-                }
-                return f"{month_names[d_from.month]} {d_from.year}"
+                return f"{_MONTH_NAMES_ES[d_from.month]} {d_from.year}"
 
-        return f"{d_from.strftime('%d/%m/%Y')} a {d_to.strftime('%d/%m/%Y')}"
+        return f"{_format_dmy(d_from)} a {_format_dmy(d_to)}"
 
-    except Exception:
+    except (ValueError, TypeError):
         return f"{date_from} a {date_to}"
 
 
@@ -285,29 +351,36 @@ def _extract_month_from_text(text: str, default_year: int) -> Optional[Tuple[int
     """Extrae mes y año de un fragmento de texto."""
     text = text.lower().strip()
 
-    # Buscar "mes año" o "mes de año"
-    for month_name, month_num in SPANISH_MONTHS.items():
-        pattern = rf'\b{month_name}\s*(?:de\s+)?(\d{{4}})?\b'
-        match = re.search(pattern, text)
-        if match:
-            year = int(match.group(1)) if match.group(1) else default_year
-            return (month_num, year)
+    # Buscar "mes", "mes año" o "mes de año"
+    match = _MONTH_TEXT_ALT.search(text)
+    if match:
+        year = int(match.group(2)) if match.group(2) else default_year
+        return (SPANISH_MONTHS[match.group(1)], year)
 
-    # Buscar solo mes (sin año)
-    for month_name, month_num in SPANISH_MONTHS.items():
-        if month_name in text:
-            return (month_num, default_year)
+    # Buscar solo mes como substring (sin limites de palabra)
+    match = _ANY_MONTH_RE.search(text)
+    if match:
+        return (SPANISH_MONTHS[match.group(0)], default_year)
 
     return None
 
 
 def is_comparison_query(question: str) -> bool:
     """Detecta si la pregunta es una comparación entre periodos."""
-    q = question.lower()
-    for pattern in COMPARISON_PATTERNS:
-        if re.search(pattern, q):
-            return True
-    return False
+    return _COMPARISON_RE.search(_normalize_question(question)) is not None
+
+
+def _single_period(question: str, today: date) -> ComparisonDateRange:
+    """Periodo unico (no comparacion); por defecto los ultimos 30 dias."""
+    date_from, date_to = extract_date_range(question)
+    return ComparisonDateRange(
+        is_comparison=False,
+        current_period=DatePeriod(
+            label=format_date_context(date_from, date_to),
+            date_from=date_from or (today - timedelta(days=30)).isoformat(),
+            date_to=date_to or (today + _ONE_DAY).isoformat()
+        )
+    )
 
 
 def extract_comparison_dates(question: str) -> ComparisonDateRange:
@@ -323,38 +396,19 @@ def extract_comparison_dates(question: str) -> ComparisonDateRange:
         ComparisonDateRange con ambos periodos si es comparación,
         o solo el periodo actual si no lo es.
     """
-    q = question.lower().strip()
+    q = _normalize_question(question)
     today = date.today()
 
     # Si no es comparación, usar extracción normal
-    if not is_comparison_query(question):
-        date_from, date_to = extract_date_range(question)
-        label = format_date_context(date_from, date_to)
-        return ComparisonDateRange(
-            is_comparison=False,
-            current_period=DatePeriod(
-                label=label,
-                date_from=date_from or (today - timedelta(days=30)).isoformat(),
-                date_to=date_to or (today + timedelta(days=1)).isoformat()
-            )
-        )
+    if not _COMPARISON_RE.search(q):
+        return _single_period(question, today)
 
     # Es una comparación - dividir por el patrón de comparación
-    split_pattern = r'\s*(?:vs\.?|versus|contra|comparado?\s+con|comparacion\s+(?:con|de)|diferencia\s+(?:con|entre))\s*'
-    parts = re.split(split_pattern, q, maxsplit=1)
+    parts = _COMPARISON_RE.split(q, maxsplit=1)
 
     if len(parts) < 2:
         # No se pudo dividir, extraer fecha normal
-        date_from, date_to = extract_date_range(question)
-        label = format_date_context(date_from, date_to)
-        return ComparisonDateRange(
-            is_comparison=False,
-            current_period=DatePeriod(
-                label=label,
-                date_from=date_from or (today - timedelta(days=30)).isoformat(),
-                date_to=date_to or (today + timedelta(days=1)).isoformat()
-            )
-        )
+        return _single_period(question, today)
 
     part1, part2 = parts[0], parts[1]
 
@@ -377,48 +431,26 @@ def extract_comparison_dates(question: str) -> ComparisonDateRange:
             month2 = (month2_date.month, month2_date.year)
 
     # Si aún no hay month2 pero hay month1, inferir mes anterior
+    # (part2 no nombra ningun mes: _extract_month_from_text ya lo habria encontrado)
     if month1 and not month2:
         # Buscar si menciona "mes pasado", "anterior", etc.
         if any(kw in part2 for kw in ["pasado", "anterior", "previo"]):
-            prev_month = month1[0] - 1 if month1[0] > 1 else 12
-            prev_year = month1[1] if month1[0] > 1 else month1[1] - 1
-            month2 = (prev_month, prev_year)
-        # Si la parte2 solo tiene nombre de mes, usar mismo año o año anterior
-        else:
-            for month_name, month_num in SPANISH_MONTHS.items():
-                if month_name in part2.lower():
-                    # Si el mes comparado es mayor, probablemente es del año anterior
-                    if month_num > month1[0]:
-                        month2 = (month_num, month1[1] - 1)
-                    else:
-                        month2 = (month_num, month1[1])
-                    break
-
-    # Si no hay month1 pero hay month2, month1 es el actual
-    if month2 and not month1:
-        month1 = (today.month, today.year)
+            month2 = _previous_month(*month1)
 
-    # Si no hay ninguno, usar default
+    # Sin month1 (haya o no month2), month1 es el mes actual
     if not month1:
         month1 = (today.month, today.year)
     if not month2:
         # Mes anterior por defecto
-        month2 = (month1[0] - 1 if month1[0] > 1 else 12,
-                  month1[1] if month1[0] > 1 else month1[1] - 1)
+        month2 = _previous_month(*month1)
 
     # Construir rangos de fecha
     current_from, current_to = _get_month_range(month1[1], month1[0])
     previous_from, previous_to = _get_month_range(month2[1], month2[0])
 
     # Labels amigables
-    month_names = {
-        1: "Enero", 2: "Febrero", 3: "Marzo", 4: "Abril",
-        5: "Mayo", 6: "Junio", 7: "Julio", 8: "Agosto",
-        9: "Septiembre", 10: "Octubre", 11: "Noviembre", 12: "Diciembre"
-    }
-
-    current_label = f"{month_names[month1[0]]} {month1[1]}"
-    previous_label = f"{month_names[month2[0]]} {month2[1]}"
+    current_label = f"{_MONTH_NAMES_ES[month1[0]].capitalize()} {month1[1]}"
+    previous_label = f"{_MONTH_NAMES_ES[month2[0]].capitalize()} {month2[1]}"
 
     return ComparisonDateRange(
         is_comparison=True,
@@ -12,11 +12,36 @@ Supports:
 import os
 import sys
 import json
+import time
+import queue
+import atexit
 import logging
-from datetime import datetime
-from typing import Optional, Any, Dict
+import logging.handlers
+from typing import Optional, Any, Dict, Callable, Union
 from enum import Enum
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps_json(data: Dict[str, Any]) -> str:
+    """Serialize a JSON log line (orjson when installed, stdlib json otherwise)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(data)
+
+
+def _format_text_detail(detail: Any) -> str:
+    """Flat dicts as key=value pairs; nested structures fall back to JSON"""
+    if not isinstance(detail, dict):
+        return str(detail)
+    if any(isinstance(v, (dict, list)) for v in detail.values()):
+        return json.dumps(detail)
+    return " ".join(f"{k}={v}" for k, v in detail.items())
+
 
 class LogLevel(Enum):
     DEBUG = "DEBUG"
@@ -25,6 +50,9 @@ class LogLevel(Enum):
     ERROR = "ERROR"
 
 
+# Detail can be a dict or a zero-arg callable evaluated only if the level is enabled
+Detail = Union[Dict, Callable[[], Dict], None]
+
 # Map string levels to logging constants
 LEVEL_MAP = {
     "DEBUG": logging.DEBUG,
@@ -40,6 +68,17 @@ class StructuredFormatter(logging.Formatter):
     def __init__(self, use_json: bool = False):
         super().__init__()
         self.use_json = use_json
+        # (second, "YYYY-MM-DDTHH:MM:SS") of the last formatted record
+        self._last_second = (None, "")
+
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO timestamp from record.created, reusing the per-second prefix"""
+        second = int(created)
+        cached_second, prefix = self._last_second
+        if second != cached_second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._last_second = (second, prefix)
+        return f"{prefix}.{int((created - second) * 1_000_000):06d}"
 
     def format(self, record: logging.LogRecord) -> str:
         # Extract custom attributes
@@ -48,11 +87,9 @@ class StructuredFormatter(logging.Formatter):
         node = getattr(record, 'node', record.name.split('.')[-1])
         detail = getattr(record, 'detail', None)
 
-        timestamp = datetime.utcnow().isoformat()
-
         if self.use_json:
             log_data = {
-                "ts": timestamp,
+                "ts": self._timestamp(record.created),
                 "node": node,
                 "trace_id": trace_id,
                 "status": status,
@@ -63,22 +100,23 @@ class StructuredFormatter(logging.Formatter):
                 log_data["detail"] = detail
             if record.exc_info:
                 log_data["exception"] = self.formatException(record.exc_info)
-            return json.dumps(log_data)
+            return _dumps_json(log_data)
         else:
             # Text format: [NODE] trace_id | status | message | detail
             base = f"[{node}] {trace_id} | {status} | {record.getMessage()}"
-            if detail:
-                detail_str = json.dumps(detail) if isinstance(detail, dict) else str(detail)
-                base += f" | {detail_str}"
-            return base
+            if not detail:
+                return base
+            return f"{base} | {_format_text_detail(detail)}"
 
 
 class StructuredLogger:
     """Logger with structured output for SQL-Agent components"""
 
-    def __init__(self, node_name: str):
-        self.node_name = node_name
-        self._logger = logging.getLogger(f"sql-agent.{node_name}")
+    __slots__ = ('node_name', '_logger')
+
+    def __init__(self, node_name: str, logger: Optional[logging.Logger] = None):
+        self.node_name = sys.intern(node_name)
+        self._logger = logger or logging.getLogger(f"sql-agent.{node_name}")
 
     def _log(
         self,
@@ -86,10 +124,19 @@ class StructuredLogger:
         trace_id: str,
         status: str,
         message: str,
-        detail: Optional[Dict] = None,
-        exc_info: bool = False
+        detail: Detail = None,
+        exc_info: Optional[bool] = False
     ):
-        """Internal log method with extra attributes"""
+        """Internal log method with extra attributes (exc_info=None: only inside an except)"""
+        # Skip building the record (and lazy detail) for disabled levels
+        if not self._logger.isEnabledFor(level):
+            return
+        if exc_info is None:
+            exc_info = sys.exc_info()[0] is not None
+        if callable(detail):
+            detail = detail()
+        # One shared string per trace across all of its records
+        trace_id = sys.intern(trace_id) if trace_id else 'unknown'
         extra = {
             'trace_id': trace_id,
             'status': status,
@@ -98,44 +145,89 @@ class StructuredLogger:
         }
         self._logger.log(level, message, extra=extra, exc_info=exc_info)
 
-    def debug(self, trace_id: str, message: str, detail: Optional[Dict] = None):
-        """Debug level log"""
+    def debug(self, trace_id: str, message: str, detail: Detail = None):
+        """Debug level log (pass a callable as detail to build it only when enabled)"""
         self._log(logging.DEBUG, trace_id, "DEBUG", message, detail)
 
-    def info(self, trace_id: str, message: str, detail: Optional[Dict] = None):
+    def info(self, trace_id: str, message: str, detail: Detail = None):
         """Info level log"""
         self._log(logging.INFO, trace_id, "INFO", message, detail)
 
-    def warning(self, trace_id: str, message: str, detail: Optional[Dict] = None):
+    def warning(self, trace_id: str, message: str, detail: Detail = None):
         """Warning level log"""
         self._log(logging.WARNING, trace_id, "WARNING", message, detail)
 
-    def error(self, trace_id: str, message: str, detail: Optional[Dict] = None, exc_info: bool = True):
-        """Error level log with optional exception info"""
+    def error(self, trace_id: str, message: str, detail: Detail = None, exc_info: Optional[bool] = None):
+        """Error level log; attaches the active exception, if any, unless exc_info is given"""
         self._log(logging.ERROR, trace_id, "ERROR", message, detail, exc_info=exc_info)
 
-    def start(self, trace_id: str, message: str, detail: Optional[Dict] = None):
+    def start(self, trace_id: str, message: str, detail: Detail = None):
         """Log start of an operation"""
         self._log(logging.INFO, trace_id, "START", message, detail)
 
-    def end(self, trace_id: str, message: str, detail: Optional[Dict] = None):
+    def end(self, trace_id: str, message: str, detail: Detail = None):
         """Log end of an operation"""
         self._log(logging.INFO, trace_id, "END", message, detail)
 
-    def progress(self, trace_id: str, message: str, detail: Optional[Dict] = None):
+    def progress(self, trace_id: str, message: str, detail: Detail = None):
         """Log progress of an operation"""
         self._log(logging.INFO, trace_id, "PROGRESS", message, detail)
 
 
+class _FdStreamHandler(logging.Handler):
+    """Writes formatted records straight to a file descriptor with os.write"""
+
+    def __init__(self, fd: int):
+        super().__init__()
+        self.fd = fd
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            data = memoryview((self.format(record) + "\n").encode("utf-8", "replace"))
+            # os.write may write partially on pipes
+            while data:
+                data = data[os.write(self.fd, data):]
+        except Exception:
+            self.handleError(record)
+
+
+def _stdout_handler() -> logging.Handler:
+    """fd-level stdout handler, or a StreamHandler when stdout has no real fd"""
+    try:
+        fd = sys.stdout.fileno()
+        sys.stdout.flush()
+    except (AttributeError, ValueError, OSError):
+        return logging.StreamHandler(sys.stdout)
+    return _FdStreamHandler(fd)
+
+
 # Global loggers cache
 _loggers: Dict[str, StructuredLogger] = {}
 
 
 def get_logger(node_name: str) -> StructuredLogger:
-    """Get or create a structured logger for a node"""
-    if node_name not in _loggers:
-        _loggers[node_name] = StructuredLogger(node_name)
-    return _loggers[node_name]
+    """Get or create a structured logger for a node (cached per node name)"""
+    logger = _loggers.get(node_name)
+    if logger is None:
+        logger = _loggers[node_name] = StructuredLogger(
+            node_name, logging.getLogger(f"sql-agent.{node_name}")
+        )
+    return logger
+
+
+# Background writer started by configure_logging
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def shutdown_logging() -> None:
+    """Flush pending records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
 
 
 def configure_logging(
@@ -149,6 +241,8 @@ def configure_logging(
         level: Log level (DEBUG, INFO, WARNING, ERROR). Default from LOG_LEVEL env.
         format_type: Output format (json, text). Default from LOG_FORMAT env.
     """
+    global _listener
+
     # Get settings from env or params
     log_level = level or os.getenv("LOG_LEVEL", "INFO").upper()
     log_format = format_type or os.getenv("LOG_FORMAT", "text").lower()
@@ -164,14 +258,25 @@ def configure_logging(
     root_logger = logging.getLogger("sql-agent")
     root_logger.setLevel(numeric_level)
 
-    # Remove existing handlers
-    root_logger.handlers = []
+    # Stop the listener of a previous configuration (drains its queue)
+    shutdown_logging()
+
+    # Records are formatted in the calling thread (QueueHandler.prepare)
+    # and written to stdout by a listener thread, off the request path.
+    # Only that thread writes, so os.write needs no TextIOWrapper lock.
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setLevel(numeric_level)
+    queue_handler.setFormatter(formatter)
+
+    stream_handler = _stdout_handler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    # Replace existing handlers
+    root_logger.handlers = [queue_handler]
 
-    # Add stdout handler
-    handler = logging.StreamHandler(sys.stdout)
-    handler.setLevel(numeric_level)
-    handler.setFormatter(formatter)
-    root_logger.addHandler(handler)
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _listener.start()
 
     # Prevent propagation to root logger
     root_logger.propagate = False
@@ -9,8 +9,53 @@ import json
 from typing import Type, TypeVar, Optional, Any, Dict
 from pydantic import BaseModel, ValidationError
 
+try:
+    from langchain_core.messages import HumanMessage
+except ImportError:
+    HumanMessage = None
+
 T = TypeVar('T', bound=BaseModel)
 
+# Decoder compartido: raw_decode parsea el primer valor JSON desde un offset
+_DECODER = json.JSONDecoder()
+
+# Patrones precompilados
+_MARKDOWN_RE = re.compile(r'```(?:json)?\s*([\s\S]*?)\s*```')
+_QUOTED_KEY_RE = re.compile(r"'(\w+)'")
+_QUOTED_VALUE_RE = re.compile(r":\s*'([^']*)'")
+_QUERY_IDS_RE = re.compile(r'query_ids["\']?\s*:\s*\[(.*?)\]', re.IGNORECASE)
+_QUOTED_ITEM_RE = re.compile(r'["\']([^"\']+)["\']')
+_PARAMS_RE = re.compile(r'params["\']?\s*:\s*\{([^}]*)\}', re.IGNORECASE)
+_OPENER_RE = re.compile(r'[{\[]')
+
+# Claves del plan que el fallback recupera de los objetos JSON embebidos
+_FALLBACK_KEYS = ('query_ids', 'params')
+
+
+def _span_end(content: str, start: int) -> int:
+    """Fin del valor que abre en start, contando llaves/corchetes fuera de strings"""
+    depth = 0
+    in_string = False
+    i = start
+    while i < len(content):
+        char = content[i]
+        if in_string:
+            if char == '\\':
+                i += 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    # Sin cierre: todo lo que sigue queda dentro del valor roto
+    return len(content)
+
 
 class RobustJSONParser:
     """
@@ -19,7 +64,7 @@ class RobustJSONParser:
     Orden de intentos:
     1. Parse directo
     2. Limpiar markdown
-    3. Extraer JSON con regex
+    3. Extraer JSON embebido (raw_decode)
     4. Fix de comillas simples
     5. OutputFixing con LLM (opcional)
     """
@@ -44,16 +89,20 @@ class RobustJSONParser:
         Returns:
             Dict parseado y opcionalmente validado
         """
-        if not content or not content.strip():
+        if not content:
             return {}
 
-        content = content.strip()
-        parsed = None
+        # Solo copiar el string si realmente tiene espacios en los bordes
+        if content[0].isspace() or content[-1].isspace():
+            content = content.strip()
+            if not content:
+                return {}
 
-        # Estrategia 1: Parse directo
-        parsed = self._try_direct_parse(content)
-        if parsed is not None:
-            return self._validate_schema(parsed, schema)
+        # Estrategia 1: Parse directo (un bloque ``` nunca es JSON valido)
+        if content[0] != '`':
+            parsed = self._try_direct_parse(content)
+            if parsed is not None:
+                return self._validate_schema(parsed, schema)
 
         # Estrategia 2: Limpiar markdown
         cleaned = self._clean_markdown(content)
@@ -62,12 +111,10 @@ class RobustJSONParser:
             if parsed is not None:
                 return self._validate_schema(parsed, schema)
 
-        # Estrategia 3: Extraer JSON con regex
-        extracted = self._extract_json_regex(content)
-        if extracted:
-            parsed = self._try_direct_parse(extracted)
-            if parsed is not None:
-                return self._validate_schema(parsed, schema)
+        # Estrategia 3: Extraer el primer JSON embebido en el texto
+        parsed = self._extract_embedded_json(content)
+        if parsed is not None:
+            return self._validate_schema(parsed, schema)
 
         # Estrategia 4: Fix de comillas
         fixed = self._fix_quotes(content)
@@ -95,39 +142,46 @@ class RobustJSONParser:
     def _clean_markdown(self, content: str) -> str:
         """Limpia bloques de código markdown"""
         # ```json ... ``` o ``` ... ```
-        match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', content)
+        match = _MARKDOWN_RE.search(content)
         if match:
             return match.group(1).strip()
         return content
 
-    def _extract_json_regex(self, content: str) -> Optional[str]:
-        """Extrae objeto JSON usando regex"""
-        # Buscar objeto { ... }
-        match = re.search(r'\{[\s\S]*\}', content)
-        if match:
-            return match.group(0)
-
-        # Buscar array [ ... ]
-        match = re.search(r'\[[\s\S]*\]', content)
-        if match:
-            return match.group(0)
-
-        return None
+    def _extract_embedded_json(self, content: str) -> Optional[Any]:
+        """Parsea el primer objeto JSON balanceado del texto (o, si no hay, el primer array)"""
+        # Se recorre cada '{'/'[' en orden: un objeto gana sobre un array previo
+        # (ej. "[2] queries: {...}"), y los valores anidados dentro de un valor
+        # ya decodificado o roto se saltan, nunca reemplazan al exterior
+        first_array = None
+        start = _OPENER_RE.search(content)
+        while start is not None:
+            pos = start.start()
+            try:
+                value, end = _DECODER.raw_decode(content, pos)
+            except json.JSONDecodeError:
+                end = _span_end(content, pos)
+            else:
+                if isinstance(value, dict):
+                    return value
+                if first_array is None:
+                    first_array = value
+            start = _OPENER_RE.search(content, end)
+        return first_array
 
     def _fix_quotes(self, content: str) -> str:
         """Intenta arreglar comillas simples (Python dict syntax)"""
         # Solo si no tiene comillas dobles
         if "'" in content and '"' not in content:
             # Reemplazar 'key' por "key"
-            fixed = re.sub(r"'(\w+)'", r'"\1"', content)
+            fixed = _QUOTED_KEY_RE.sub(r'"\1"', content)
             # Reemplazar : 'value' por : "value"
-            fixed = re.sub(r":\s*'([^']*)'", r': "\1"', fixed)
+            fixed = _QUOTED_VALUE_RE.sub(r': "\1"', fixed)
             return fixed
         return content
 
     def _fix_with_llm(self, content: str, schema: Type[T] = None) -> Optional[Dict]:
         """Usa LLM para corregir JSON malformado"""
-        if not self.llm:
+        if not self.llm or HumanMessage is None:
             return None
 
         schema_hint = ""
@@ -144,11 +198,12 @@ Texto a corregir:
 {content}
 
 JSON corregido:"""
+        # El prompt no cambia entre reintentos: construir el mensaje una vez
+        messages = [HumanMessage(content=prompt)]
 
         for attempt in range(self.max_retries):
             try:
-                from langchain_core.messages import HumanMessage
-                response = self.llm.invoke([HumanMessage(content=prompt)])
+                response = self.llm.invoke(messages)
                 fixed = str(response.content).strip()
                 fixed = self._clean_markdown(fixed)
                 return json.loads(fixed)
@@ -172,29 +227,40 @@ JSON corregido:"""
             return data
 
     def _extract_structured_fallback(self, content: str) -> Dict:
-        """Fallback: intentar extraer estructura mínima con regex"""
+        """Fallback: recuperar query_ids/params de objetos JSON válidos y, si faltan, con regex"""
         result = {}
 
-        # Intentar extraer query_ids
-        query_ids_match = re.search(
-            r'query_ids["\']?\s*:\s*\[(.*?)\]',
-            content,
-            re.IGNORECASE
-        )
-        if query_ids_match:
-            ids_str = query_ids_match.group(1)
-            ids = re.findall(r'["\']([^"\']+)["\']', ids_str)
-            if ids:
-                result['query_ids'] = ids
-
-        # Intentar extraer params
-        params_match = re.search(
-            r'params["\']?\s*:\s*\{([^}]*)\}',
-            content,
-            re.IGNORECASE
-        )
-        if params_match:
-            result['params'] = {}
+        # Un solo recorrido: raw_decode en cada '{' y saltar al final de lo decodificado.
+        # Solo se toman las claves conocidas: un dict anidado dentro de un objeto
+        # roto (ej. el valor de "params") no debe subir al nivel superior
+        start = content.find('{')
+        while start != -1:
+            try:
+                obj, end = _DECODER.raw_decode(content, start)
+            except json.JSONDecodeError:
+                end = start + 1
+            else:
+                if isinstance(obj, dict):
+                    result.update((key, obj[key]) for key in _FALLBACK_KEYS if key in obj)
+            start = content.find('{', end)
+
+        # Intentar extraer query_ids (sintaxis no JSON)
+        if 'query_ids' not in result:
+            query_ids_match = _QUERY_IDS_RE.search(content)
+            if query_ids_match:
+                ids = _QUOTED_ITEM_RE.findall(query_ids_match.group(1))
+                if ids:
+                    result['query_ids'] = ids
+
+        # Intentar extraer params: el objeto si es JSON valido, si no vacio
+        if 'params' not in result:
+            params_match = _PARAMS_RE.search(content)
+            if params_match:
+                try:
+                    params = _DECODER.raw_decode(content, params_match.start(1) - 1)[0]
+                except json.JSONDecodeError:
+                    params = {}
+                result['params'] = params if isinstance(params, dict) else {}
 
         print(f"[RobustParser] Fallback extracted: {result}")
         return result
@@ -236,6 +302,9 @@ class OutputFixingParser:
 
     def _correct_with_llm(self, original: str, error: ValidationError) -> Optional[Dict]:
         """Usa LLM para corregir errores de validación"""
+        if HumanMessage is None:
+            return None
+
         prompt = f"""El JSON tiene errores de validación:
 Error: {error}
 
@@ -245,7 +314,6 @@ JSON original:
 Corrige el JSON para que cumpla con los requisitos. Devuelve SOLO el JSON corregido."""
 
         try:
-            from langchain_core.messages import HumanMessage
             response = self.llm.invoke([HumanMessage(content=prompt)])
             cleaned = self.robust_parser._clean_markdown(str(response.content))
             return json.loads(cleaned)
@@ -0,0 +1,51 @@
+"""
+SQL Rewrite - Post-procesamiento de SQL en texto
+
+Reescrituras que conservan el tipo de cada columna de salida:
+- GROUP BY DATE(col) -> GROUP BY date_trunc('day', col)::date en columnas timestamp
+
+No esta conectado a la ejecucion: SupabaseRESTClient resuelve cada query del
+allowlist via PostgREST y nunca envia el texto del template a Postgres.
+Aplicar rewrite_sql cuando exista un executor que ejecute SQL directo.
+"""
+import re
+from typing import FrozenSet
+
+from ..sql.schema_registry import SCHEMA_COLUMNS
+
+
+# Columnas timestamp conocidas del registry (por nombre, sin tabla)
+TEMPORAL_COLUMNS: FrozenSet[str] = frozenset(
+    col.name for _table_name, col in SCHEMA_COLUMNS if col.is_temporal
+)
+
+# DATE(col) o DATE(alias.col); CURRENT_DATE y date_trunc no matchean por el \b
+_DATE_CALL_RE = re.compile(r"\bDATE\s*\(\s*((?:\w+\.)?(\w+))\s*\)", re.IGNORECASE)
+_GROUP_BY_RE = re.compile(r"\bGROUP\s+BY\b", re.IGNORECASE)
+
+
+def _date_to_trunc(match: re.Match) -> str:
+    if match.group(2).lower() in TEMPORAL_COLUMNS:
+        # date_trunc devuelve timestamp: el cast mantiene el tipo date de DATE(col)
+        return f"date_trunc('day', {match.group(1)})::date"
+    return match.group(0)
+
+
+def rewrite_date_grouping(sql: str) -> str:
+    """
+    Reescribe DATE(col) como date_trunc('day', col)::date en queries agrupadas.
+
+    Se reescriben todas las ocurrencias (SELECT y GROUP BY) para que la
+    expresion proyectada siga coincidiendo con la agrupada.
+    """
+    if not _GROUP_BY_RE.search(sql):
+        return sql
+    return _DATE_CALL_RE.sub(_date_to_trunc, sql)
+
+
+def rewrite_sql(sql: str) -> str:
+    """
+    Aplica todas las reescrituras. Pensado para SQL que se ejecute directo
+    contra Postgres, antes de validarlo y ejecutarlo.
+    """
+    return rewrite_date_grouping(sql)
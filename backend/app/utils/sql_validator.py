@@ -6,6 +6,8 @@ Implementa validación de seguridad mediante análisis del AST:
 - Detecta operaciones peligrosas
 - Valida estructura de la query
 """
+import re
+from functools import lru_cache
 from typing import Tuple, List, Optional, Set
 from dataclasses import dataclass
 from enum import Enum
@@ -46,24 +48,46 @@ class SQLValidationResult:
 
 
 # Operaciones prohibidas (destructivas)
-FORBIDDEN_OPERATIONS = {
+FORBIDDEN_OPERATIONS = frozenset({
     "INSERT", "UPDATE", "DELETE", "DROP", "CREATE", "ALTER",
     "TRUNCATE", "GRANT", "REVOKE", "EXECUTE", "CALL",
     "MERGE", "REPLACE", "UPSERT"
-}
+})
 
 # Funciones peligrosas
-DANGEROUS_FUNCTIONS = {
+DANGEROUS_FUNCTIONS = frozenset({
     "pg_read_file", "pg_read_binary_file", "pg_write_file",
     "lo_import", "lo_export", "dblink", "dblink_exec",
     "pg_execute_server_program", "copy"
-}
+})
 
 # Tablas sensibles que requieren aprobación
-SENSITIVE_TABLES = {
+SENSITIVE_TABLES = frozenset({
     "users", "credentials", "passwords", "secrets", "tokens",
     "api_keys", "auth_tokens", "sessions"
-}
+})
+
+# Patrones precompilados (case-insensitive: evitan copiar el SQL con upper/lower)
+_LEADING_KEYWORD_RE = re.compile(r'\s*(SELECT|WITH)', re.IGNORECASE)
+_SELECT_RE = re.compile('SELECT', re.IGNORECASE)
+# Operaciones prohibidas como palabra completa
+_FORBIDDEN_RE = re.compile(r'\b(' + '|'.join(sorted(FORBIDDEN_OPERATIONS)) + r')\b', re.IGNORECASE)
+# Funciones peligrosas como substring; las más largas primero
+_DANGEROUS_RE = re.compile(
+    '|'.join(map(re.escape, sorted(DANGEROUS_FUNCTIONS, key=len, reverse=True))), re.IGNORECASE
+)
+_LINE_COMMENT_RE = re.compile(r'--.*$', re.MULTILINE)
+_BLOCK_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_FROM_JOIN_RE = re.compile(r'\b(?:FROM|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1024)
+def _parse_cached(sql: str) -> tuple:
+    """
+    Parsea SQL con sqlglot (dialecto postgres), cacheado por texto.
+    Los AST se comparten entre llamadas: solo leerlos, nunca mutarlos.
+    """
+    return tuple(sqlglot.parse(sql, dialect="postgres"))
 
 
 def validate_sql_basic(sql: str) -> Tuple[bool, str]:
@@ -71,26 +95,23 @@ def validate_sql_basic(sql: str) -> Tuple[bool, str]:
     Validación básica sin sqlglot.
     Detecta operaciones peligrosas mediante búsqueda de texto.
     """
-    sql_upper = sql.upper().strip()
-
     # Verificar que empiece con SELECT
-    if not sql_upper.startswith("SELECT"):
-        # Permitir WITH ... SELECT (CTEs)
-        if not (sql_upper.startswith("WITH") and "SELECT" in sql_upper):
-            return False, "Solo se permiten queries SELECT"
-
-    # Buscar operaciones prohibidas
-    for op in FORBIDDEN_OPERATIONS:
-        # Buscar la operación como palabra completa
-        import re
-        if re.search(rf'\b{op}\b', sql_upper):
-            return False, f"Operación prohibida detectada: {op}"
+    match = _LEADING_KEYWORD_RE.match(sql)
+    if not match:
+        return False, "Solo se permiten queries SELECT"
+    # Permitir WITH ... SELECT (CTEs)
+    if match.group(1).upper() == "WITH" and not _SELECT_RE.search(sql):
+        return False, "Solo se permiten queries SELECT"
+
+    # Buscar operaciones prohibidas (una sola pasada)
+    match = _FORBIDDEN_RE.search(sql)
+    if match:
+        return False, f"Operación prohibida detectada: {match.group(1).upper()}"
 
     # Buscar funciones peligrosas
-    sql_lower = sql.lower()
-    for func in DANGEROUS_FUNCTIONS:
-        if func in sql_lower:
-            return False, f"Función peligrosa detectada: {func}"
+    match = _DANGEROUS_RE.search(sql)
+    if match:
+        return False, f"Función peligrosa detectada: {match.group(0).lower()}"
 
     # Buscar comentarios SQL (posible inyección)
     if "--" in sql or "/*" in sql:
@@ -109,7 +130,7 @@ def validate_sql_ast(sql: str) -> SQLValidationResult:
     """
     errors = []
     warnings = []
-    tables_accessed = []
+    tables_seen = {}  # dict como set ordenado: orden de aparición sin duplicados
     operations_found = []
 
     # Validación básica primero
@@ -137,7 +158,7 @@ def validate_sql_ast(sql: str) -> SQLValidationResult:
 
     try:
         # Parsear SQL a AST
-        parsed = sqlglot.parse(sql, dialect="postgres")
+        parsed = _parse_cached(sql)
 
         if not parsed:
             return SQLValidationResult(
@@ -166,36 +187,38 @@ def validate_sql_ast(sql: str) -> SQLValidationResult:
                     errors.append(f"Operación no permitida: {stmt_type}")
                     continue
 
-            # Extraer tablas accedidas
-            for table in statement.find_all(exp.Table):
-                table_name = table.name.lower() if table.name else ""
-                if table_name and table_name not in tables_accessed:
-                    tables_accessed.append(table_name)
-
-                # Verificar tablas sensibles
-                if table_name in SENSITIVE_TABLES:
-                    warnings.append(f"Acceso a tabla sensible: {table_name}")
-
-            # Buscar subqueries que podrían ser peligrosas
-            for subquery in statement.find_all(exp.Subquery):
-                # Las subqueries deben ser SELECT
-                if hasattr(subquery, 'this') and not isinstance(subquery.this, exp.Select):
-                    errors.append("Subquery debe ser SELECT")
-
-            # Buscar funciones peligrosas en el AST
-            for func in statement.find_all(exp.Func):
-                func_name = func.name.lower() if hasattr(func, 'name') else ""
-                if func_name in DANGEROUS_FUNCTIONS:
-                    errors.append(f"Función peligrosa: {func_name}")
-
-            # Buscar UNION/INTERSECT/EXCEPT que podrían ocultar operaciones
-            for union in statement.find_all(exp.Union):
-                operations_found.append("UNION")
-                # Verificar que ambos lados sean SELECT
-                if hasattr(union, 'this') and not isinstance(union.this, exp.Select):
-                    errors.append("UNION debe contener solo SELECT")
-                if hasattr(union, 'expression') and not isinstance(union.expression, exp.Select):
-                    errors.append("UNION debe contener solo SELECT")
+            # Un solo recorrido del AST (BFS, como find_all) para tablas,
+            # subqueries, funciones y UNIONs
+            for node in statement.walk():
+                if isinstance(node, exp.Table):
+                    # Extraer tablas accedidas
+                    table_name = node.name.lower() if node.name else ""
+                    if table_name:
+                        tables_seen[table_name] = None
+
+                    # Verificar tablas sensibles
+                    if table_name in SENSITIVE_TABLES:
+                        warnings.append(f"Acceso a tabla sensible: {table_name}")
+
+                elif isinstance(node, exp.Subquery):
+                    # Las subqueries deben ser SELECT
+                    if hasattr(node, 'this') and not isinstance(node.this, exp.Select):
+                        errors.append("Subquery debe ser SELECT")
+
+                elif isinstance(node, exp.Func):
+                    # Buscar funciones peligrosas en el AST
+                    func_name = node.name.lower() if hasattr(node, 'name') else ""
+                    if func_name in DANGEROUS_FUNCTIONS:
+                        errors.append(f"Función peligrosa: {func_name}")
+
+                elif isinstance(node, exp.Union):
+                    # UNION/INTERSECT/EXCEPT podrían ocultar operaciones
+                    operations_found.append("UNION")
+                    # Verificar que ambos lados sean SELECT
+                    if hasattr(node, 'this') and not isinstance(node.this, exp.Select):
+                        errors.append("UNION debe contener solo SELECT")
+                    if hasattr(node, 'expression') and not isinstance(node.expression, exp.Select):
+                        errors.append("UNION debe contener solo SELECT")
 
     except ParseError as e:
         errors.append(f"Error de sintaxis SQL: {str(e)}")
@@ -203,6 +226,8 @@ def validate_sql_ast(sql: str) -> SQLValidationResult:
     except Exception as e:
         errors.append(f"Error validando SQL: {str(e)}")
 
+    tables_accessed = list(tables_seen)
+
     # Determinar nivel de riesgo
     if errors:
         risk_level = SQLRiskLevel.CRITICAL
@@ -232,9 +257,8 @@ def sanitize_sql(sql: str) -> str:
     Sanitiza una query SQL eliminando elementos peligrosos.
     """
     # Remover comentarios
-    import re
-    sql = re.sub(r'--.*$', '', sql, flags=re.MULTILINE)
-    sql = re.sub(r'/\*.*?\*/', '', sql, flags=re.DOTALL)
+    sql = _LINE_COMMENT_RE.sub('', sql)
+    sql = _BLOCK_COMMENT_RE.sub('', sql)
 
     # Remover punto y coma extra
     sql = sql.strip().rstrip(';') + ';'
@@ -250,16 +274,13 @@ def extract_tables_from_query(sql: str) -> List[str]:
     Extrae las tablas mencionadas en una query SQL.
     """
     if not SQLGLOT_AVAILABLE:
-        # Extracción básica con regex
-        import re
-        # Buscar patrones FROM/JOIN table_name
-        pattern = r'\b(?:FROM|JOIN)\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        matches = re.findall(pattern, sql, re.IGNORECASE)
-        return list(set(matches))
+        # Extracción básica con regex: FROM/JOIN table_name
+        return list(set(_FROM_JOIN_RE.findall(sql)))
 
     try:
         tables = []
-        parsed = sqlglot.parse(sql, dialect="postgres")
+        # Misma clave que validate_and_sanitize: reutiliza su parse cacheado
+        parsed = _parse_cached(sanitize_sql(sql))
         for statement in parsed:
             for table in statement.find_all(exp.Table):
                 if table.name:
@@ -11,8 +11,7 @@ db = get_db_client()
 
 print('=== TOP 10 PRODUCTOS (por unidades vendidas) ===')
 items = db._get_table('ml_items', select='item_id,title,price,total_sold,category_id', order='total_sold.desc.nullslast', limit=10)
-for i, item in enumerate(items, 1):
-    title = item.get("title", "")[:45]
-    price = item.get("price", 0) or 0
-    sold = item.get("total_sold", 0) or 0
-    print(f'{i:2}. {title} | ${price:,} | {sold} vendidos')
+print('\n'.join(
+    f'{i:2}. {(item.get("title") or "")[:45]} | ${item.get("price") or 0:,} | {item.get("total_sold") or 0} vendidos'
+    for i, item in enumerate(items, 1)
+))
@@ -0,0 +1,11 @@
+-- Migration: 003_materialized_views.sql
+-- Description: Pre-aggregated materialized views declared in app/sql/schema_registry.py
+-- Generated by generate_materialized_views_sql(); regenerate instead of editing by hand.
+--
+-- Refresh (e.g. from pg_cron):
+--   REFRESH MATERIALIZED VIEW CONCURRENTLY mv_ml_orders_daily;
+
+-- mv_ml_orders_daily (refresh every 1 hour)
+CREATE MATERIALIZED VIEW IF NOT EXISTS mv_ml_orders_daily AS
+SELECT date_trunc('day', date_created) AS day, status, SUM(total_amount) AS total_amount, SUM(quantity) AS units, COUNT(*) AS order_count FROM ml_orders GROUP BY 1, 2;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_mv_ml_orders_daily_key ON mv_ml_orders_daily (day, status);
@@ -0,0 +1,16 @@
+-- Migration: 004_auto_indexes.sql
+-- Description: Indexes on FK columns and filter/group columns declared in app/sql/schema_registry.py
+-- Generated by generate_indexes_sql(); regenerate instead of editing by hand.
+--
+-- On large tables run each statement separately as CREATE INDEX CONCURRENTLY
+-- (not allowed inside the implicit transaction of a multi-statement script).
+
+CREATE INDEX IF NOT EXISTS idx_ml_orders_item_id ON ml_orders (item_id);
+CREATE INDEX IF NOT EXISTS idx_escalations_conversation_id ON escalations (conversation_id);
+CREATE INDEX IF NOT EXISTS idx_preventa_queries_item_id ON preventa_queries (item_id);
+CREATE INDEX IF NOT EXISTS idx_ml_items_status ON ml_items (status);
+CREATE INDEX IF NOT EXISTS idx_ml_orders_status ON ml_orders (status);
+CREATE INDEX IF NOT EXISTS idx_conversations_status ON conversations (status);
+CREATE INDEX IF NOT EXISTS idx_escalations_case_type ON escalations (case_type);
+CREATE INDEX IF NOT EXISTS idx_escalations_status ON escalations (status);
+CREATE INDEX IF NOT EXISTS idx_preventa_queries_status ON preventa_queries (status);
@@ -14,11 +14,16 @@ if __name__ == '__main__':
     from dotenv import load_dotenv
     load_dotenv()
 
-    # Run uvicorn
+    # Run uvicorn (RELOAD=false + WORKERS=N for multi-process serving;
+    # loop/http "auto" pick uvloop/httptools from uvicorn[standard] when available)
     import uvicorn
+    reload = os.getenv("RELOAD", "true").lower() == "true"
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=int(os.getenv("PORT", 8000)),
-        reload=True
+        reload=reload,
+        workers=None if reload else int(os.getenv("WORKERS", 1)),
+        loop="auto",
+        http="auto",
     )
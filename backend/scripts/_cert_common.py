@@ -0,0 +1,176 @@
+"""
+_cert_common.py - Chequeos compartidos por final_check.py y verify_setup.py
+
+Cada chequeo es un generador: produce una linea por verificacion correcta
+y lanza una excepcion en la primera que falla. run_checks imprime el
+resultado, acumula los errores y salta los chequeos cuyo prerequisito fallo.
+
+Uso (desde un script, con el backend en sys.path):
+    from scripts._cert_common import run_checks, check_state, check_db
+"""
+import ast
+import re
+import inspect
+import importlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MAIN_PY_PATH = BACKEND_DIR / "app" / "main.py"
+
+# (etiqueta, descripcion, chequeo, etiquetas de prerequisitos)
+Check = Tuple[str, str, Callable[[], Iterator[str]], Tuple[str, ...]]
+
+
+@lru_cache(maxsize=None)
+def _src(fn) -> str:
+    """Codigo fuente de una funcion (una sola llamada a inspect por funcion)"""
+    return inspect.getsource(fn)
+
+
+@lru_cache(maxsize=None)
+def _main_py_tree() -> ast.Module:
+    """AST de app/main.py, parseado una sola vez"""
+    # ast.parse acepta bytes: el compilador decodifica (PEP 263) sin un str intermedio
+    return ast.parse(MAIN_PY_PATH.read_bytes(), str(MAIN_PY_PATH))
+
+
+def _prepare_threshold_values(tree: ast.AST) -> list:
+    """Valores asignados a prepare_threshold (kwarg o clave de dict)"""
+    values = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword) and node.arg == "prepare_threshold":
+            values.append(node.value)
+        elif isinstance(node, ast.Dict):
+            values.extend(
+                value for key, value in zip(node.keys, node.values)
+                if isinstance(key, ast.Constant) and key.value == "prepare_threshold"
+            )
+    return values
+
+
+def check_state() -> Iterator[str]:
+    """InsightStateV2 (Pydantic) con memoria y grafo compilable"""
+    from app.schemas.agent_state import InsightStateV2, create_initial_state
+    from app.graphs.insight_graph import build_insight_graph_v2, InsightState
+    from pydantic import BaseModel
+
+    # Verificar que InsightState es alias de InsightStateV2
+    assert InsightState is InsightStateV2, "InsightState debe ser InsightStateV2"
+    yield "InsightState = InsightStateV2"
+
+    # Verificar que InsightStateV2 es Pydantic BaseModel
+    assert issubclass(InsightStateV2, BaseModel), "InsightStateV2 debe heredar de BaseModel"
+    yield "InsightStateV2 es Pydantic BaseModel"
+
+    # Verificar que tiene 'messages' con add_messages reducer
+    state = create_initial_state(question="test", trace_id="cert")
+    assert "messages" in state, "Falta campo 'messages'"
+    yield "Campo 'messages' presente (memoria habilitada)"
+
+    # Compilar grafo
+    build_insight_graph_v2(checkpointer=None)
+    yield "Grafo compilado correctamente"
+
+
+def check_db() -> Iterator[str]:
+    """prepare_threshold=None en el pool de app/main.py"""
+    values = _prepare_threshold_values(_main_py_tree())
+
+    assert values, "Falta prepare_threshold"
+    assert all(isinstance(v, ast.Constant) and v.value is None for v in values), \
+        "prepare_threshold debe ser None"
+    yield "prepare_threshold=None configurado"
+    yield "Compatible con Supabase Transaction Mode"
+
+
+# json.loads antes de cualquier '#' en la linea (uso real, no comentario)
+_JSON_LOADS_RE = re.compile(r"^[^#\n]*\bjson\.loads\b", re.MULTILINE)
+
+
+def check_router() -> Iterator[str]:
+    """IntentRouter usa structured output, sin parsing legacy"""
+    from app.agents.intent_router import IntentRouter
+
+    source = _src(IntentRouter._route_with_llm)
+
+    # Debe tener with_structured_output
+    assert "with_structured_output" in source, "Falta with_structured_output"
+    yield "Usa with_structured_output()"
+
+    # No debe tener json.loads (legacy parsing), salvo en comentarios
+    assert not _JSON_LOADS_RE.search(source), "Contiene json.loads legacy"
+    yield "Sin parsing legacy (json.loads)"
+
+
+# Nodos del grafo que deben escribir en 'messages'
+MEMORY_NODES = ["router_node", "data_agent_node", "presentation_node", "direct_response_node"]
+
+# Clave 'messages' con comillas simples o dobles
+_MESSAGES_KEY_RE = re.compile(r"""["']messages["']""")
+
+
+def _function_spans(source: str) -> Dict[str, Tuple[int, int]]:
+    """Nombre de funcion -> (primera, ultima linea) dentro de source"""
+    return {
+        node.name: (node.lineno, node.end_lineno)
+        for node in ast.walk(ast.parse(source))
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    }
+
+
+def check_memory_nodes() -> Iterator[str]:
+    """Los nodos del grafo escriben en 'messages'"""
+    from app.graphs import insight_graph
+
+    # Un solo getsource + parse del modulo; cada nodo se escanea una vez
+    lines = inspect.getsource(insight_graph).splitlines(keepends=True)
+    spans = _function_spans("".join(lines))
+
+    missing = []
+    for name in MEMORY_NODES:
+        span = spans.get(name)
+        if span and _MESSAGES_KEY_RE.search("".join(lines[span[0] - 1:span[1]])):
+            yield f"{name} escribe en 'messages'"
+        else:
+            missing.append(name)
+    assert not missing, f"{', '.join(missing)} no escribe(n) en 'messages'"
+
+
+# (modulo, atributo, descripcion) que deben poder importarse
+CRITICAL_IMPORTS = [
+    ("app.main", "app", "FastAPI app"),
+    ("app.agents.data_agent", "DataAgent", "DataAgent"),
+    ("app.agents.presentation_agent", "PresentationAgent", "PresentationAgent"),
+]
+
+
+def check_imports() -> Iterator[str]:
+    """Modulos criticos importables"""
+    for module_name, attr, description in CRITICAL_IMPORTS:
+        # Los modulos ya cargados por chequeos previos salen de sys.modules
+        getattr(importlib.import_module(module_name), attr)
+        yield f"{description} importable"
+
+
+def run_checks(checks: List[Check]) -> List[str]:
+    """Ejecuta los chequeos en orden, imprime [OK]/[FAIL]/[SKIP] y retorna los errores"""
+    errors = []
+    failed = set()
+    for i, (label, description, check, requires) in enumerate(checks, 1):
+        print(f"\n[{i}/{len(checks)}] {label} - {description}...")
+        # Sin reimportar modulos que ya fallaron: el error ya quedo registrado
+        blocked = [req for req in requires if req in failed]
+        if blocked:
+            failed.add(label)
+            print(f"  [SKIP] depende de {', '.join(blocked)}")
+            continue
+        try:
+            for line in check():
+                print(f"  [OK] {line}")
+        except Exception as e:
+            failed.add(label)
+            errors.append(f"{label}: {e}")
+            print(f"  [FAIL] {e}")
+    return errors
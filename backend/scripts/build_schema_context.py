@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+build_schema_context.py - Genera app/sql/schema_context_generated.py
+
+El contexto de esquema es 100% estatico: se arma una vez aca y se guarda como
+literal, asi el import de schema_docs/schema_registry no repite el armado.
+
+Debe ejecutarse cada vez que cambie schema_docs.py o schema_registry.py
+(tests/test_schema_registry.py falla si el archivo quedo desactualizado).
+
+Uso:
+    python scripts/build_schema_context.py
+"""
+import sys
+from pathlib import Path
+
+# Agregar el directorio raíz al path para imports
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.sql import schema_docs, schema_registry
+
+OUTPUT_PATH = BACKEND_DIR / "app" / "sql" / "schema_context_generated.py"
+
+HEADER = '''"""
+Contexto de esquema pre-generado.
+
+ARCHIVO GENERADO por scripts/build_schema_context.py - no editar a mano.
+"""
+'''
+
+
+def render_constant(name: str, value: str) -> str:
+    """Renderiza un str como literales adyacentes (uno por linea) para diffs legibles"""
+    pieces = "".join(f"    {line!r}\n" for line in value.splitlines(keepends=True))
+    return f"\n{name} = (\n{pieces})\n"
+
+
+def build() -> str:
+    return (
+        HEADER
+        + render_constant("DOCS_SCHEMA_CONTEXT", schema_docs.get_schema_context())
+        + render_constant("REGISTRY_SCHEMA_CONTEXT", schema_registry.get_schema_context())
+    )
+
+
+def main():
+    OUTPUT_PATH.write_text(build(), encoding="utf-8")
+    print(f"Guardado en: {OUTPUT_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -15,18 +15,51 @@ import os
 import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import TYPE_CHECKING, Callable, Dict, List, Any
 
 # Agregar el directorio raíz al path para imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
 
-from dotenv import load_dotenv
-from supabase import create_client, Client
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
-# Cargar .env
-load_dotenv()
+# supabase y dotenv se importan al usarse: importar el modulo no los carga
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Tipo SQL inferido del tipo exacto de un valor JSON (type(True) es bool, no int)
+_JSON_VALUE_TYPES = {bool: 'boolean', int: 'bigint', float: 'numeric', str: 'text'}
+
+# Consultas de fallback simultaneas (son I/O puro contra Supabase)
+MAX_PROBE_WORKERS = 16
+
+
+@lru_cache(maxsize=4)
+def _get_client(supabase_url: str, supabase_key: str) -> "Client":
+    """Cliente Supabase reutilizado por (url, key) dentro del proceso"""
+    from supabase import create_client
+    return create_client(supabase_url, supabase_key)
+
+
+def _dumps_schema(schema: Dict[str, Any]) -> bytes:
+    """JSON UTF-8 indentado (orjson si está instalado, json estándar si no)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(schema, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(schema, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _map_concurrently(fn: Callable, items: List[str]) -> List[Any]:
+    """fn sobre cada item en un pool de threads, resultados en el orden de items"""
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_PROBE_WORKERS, len(items)))) as pool:
+        return list(pool.map(fn, items))
 
 
 class SchemaExtractor:
@@ -75,8 +108,16 @@ class SchemaExtractor:
         'ml_buyers': ['compradores ML', 'clientes ML']
     }
 
+    # Queries comunes incluidas en el snapshot
+    COMMON_QUERIES = {
+        'ventas_totales': "SELECT SUM(total_amount) FROM orders WHERE status = 'paid'",
+        'productos_vendidos': "SELECT oi.title, SUM(oi.quantity) as total FROM order_items oi JOIN orders o ON oi.order_id = o.id WHERE o.status = 'paid' GROUP BY oi.title ORDER BY total DESC",
+        'stock_bajo': "SELECT id, title, available_quantity FROM products WHERE available_quantity < 10 AND status = 'active'",
+        'tasa_escalado': "SELECT COUNT(*) FILTER (WHERE was_escalated) * 100.0 / NULLIF(COUNT(*), 0) FROM agent_interactions"
+    }
+
     def __init__(self, supabase_url: str, supabase_key: str):
-        self.client: Client = create_client(supabase_url, supabase_key)
+        self.client: "Client" = _get_client(supabase_url, supabase_key)
 
     def get_tables(self) -> List[Dict[str, Any]]:
         """Obtiene lista de tablas del schema public"""
@@ -98,21 +139,29 @@ class SchemaExtractor:
             return self._get_tables_fallback()
 
     def _get_tables_fallback(self) -> List[Dict[str, Any]]:
-        """Fallback: obtener tablas consultando directamente"""
-        tables = []
-        for table in self.ALLOWED_TABLES:
-            try:
-                # Verificar si la tabla existe haciendo un count
-                self.client.table(table).select('*', count='exact').limit(0).execute()
-                tables.append({'table_name': table, 'comment': None})
-            except:
-                pass
-        return tables
-
-    def get_columns(self, table_name: str) -> List[Dict[str, Any]]:
-        """Obtiene columnas de una tabla"""
+        """Fallback: obtener tablas consultando directamente (en paralelo)"""
+        exists = _map_concurrently(self._table_exists, self.ALLOWED_TABLES)
+        return [
+            {'table_name': table, 'comment': None}
+            for table, found in zip(self.ALLOWED_TABLES, exists) if found
+        ]
+
+    def _table_exists(self, table: str) -> bool:
+        """Verificar si la tabla existe haciendo un count"""
+        try:
+            self.client.table(table).select('*', count='exact').limit(0).execute()
+            return True
+        except Exception:
+            return False
+
+    def get_all_columns(self, table_names: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Obtiene columnas de varias tablas en una sola consulta (tabla -> columnas)"""
+        if not table_names:
+            return {}
+        names = ", ".join("'" + name.replace("'", "''") + "'" for name in table_names)
         query = f"""
         SELECT
+            table_name,
             column_name,
             data_type,
             is_nullable,
@@ -120,15 +169,20 @@ class SchemaExtractor:
             character_maximum_length
         FROM information_schema.columns
         WHERE table_schema = 'public'
-        AND table_name = '{table_name}'
-        ORDER BY ordinal_position
+        AND table_name = ANY(ARRAY[{names}])
+        ORDER BY table_name, ordinal_position
         """
         try:
             result = self.client.rpc('execute_sql', {'query': query}).execute()
-            return result.data if result.data else []
         except Exception as e:
-            print(f"Error obteniendo columnas de {table_name}: {e}")
-            return self._get_columns_fallback(table_name)
+            print(f"Error obteniendo columnas (usando método alternativo): {e}")
+            return dict(zip(table_names, _map_concurrently(self._get_columns_fallback, table_names)))
+
+        # Agrupar por tabla en una pasada (las filas ya vienen en ordinal_position)
+        columns_by_table = {name: [] for name in table_names}
+        for row in (result.data or []):
+            columns_by_table.setdefault(row.pop('table_name'), []).append(row)
+        return columns_by_table
 
     def _get_columns_fallback(self, table_name: str) -> List[Dict[str, Any]]:
         """Fallback: inferir columnas de una fila de datos"""
@@ -136,23 +190,14 @@ class SchemaExtractor:
             result = self.client.table(table_name).select('*').limit(1).execute()
             if result.data and len(result.data) > 0:
                 row = result.data[0]
-                columns = []
-                for col_name, value in row.items():
-                    data_type = 'unknown'
-                    if isinstance(value, bool):
-                        data_type = 'boolean'
-                    elif isinstance(value, int):
-                        data_type = 'bigint'
-                    elif isinstance(value, float):
-                        data_type = 'numeric'
-                    elif isinstance(value, str):
-                        data_type = 'text'
-                    columns.append({
+                return [
+                    {
                         'column_name': col_name,
-                        'data_type': data_type,
+                        'data_type': _JSON_VALUE_TYPES.get(type(value), 'unknown'),
                         'is_nullable': 'YES'
-                    })
-                return columns
+                    }
+                    for col_name, value in row.items()
+                ]
         except Exception as e:
             print(f"Fallback también falló para {table_name}: {e}")
         return []
@@ -207,18 +252,13 @@ class SchemaExtractor:
             return {}
 
     def build_column_description(self, col: Dict, is_pk: bool, fk_info: str = None) -> str:
-        """Construye descripción de columna"""
-        data_type = col.get('data_type', 'unknown')
-        parts = [data_type]
-
-        if is_pk:
-            parts.insert(0, 'PK')
-        if fk_info:
-            parts.append(f'FK -> {fk_info}')
-        if col.get('is_nullable') == 'NO' and not is_pk:
-            parts.append('NOT NULL')
-
-        return ' '.join(parts)
+        """Construye descripción de columna: [PK] tipo [FK -> destino] [NOT NULL]"""
+        return ' '.join(filter(None, (
+            'PK' if is_pk else None,
+            col.get('data_type', 'unknown'),
+            f'FK -> {fk_info}' if fk_info else None,
+            'NOT NULL' if col.get('is_nullable') == 'NO' and not is_pk else None,
+        )))
 
     def extract_full_schema(self) -> Dict[str, Any]:
         """Extrae el esquema completo y lo formatea"""
@@ -229,36 +269,40 @@ class SchemaExtractor:
         pks = self.get_primary_keys()
         fks = self.get_foreign_keys()
 
-        # Construir mapa de FKs
-        fk_map = {}
-        for fk in fks:
-            key = f"{fk['from_table']}.{fk['from_column']}"
-            fk_map[key] = f"{fk['to_table']}.{fk['to_column']}"
+        # Construir mapa de FKs: (tabla, columna) -> "tabla.columna" destino
+        fk_map = {
+            (fk['from_table'], fk['from_column']): f"{fk['to_table']}.{fk['to_column']}"
+            for fk in fks
+        }
+
+        # Filtrar tablas
+        selected = [
+            table_info for table_info in tables_raw
+            if table_info['table_name'] not in self.EXCLUDED_TABLES
+            and (not self.ALLOWED_TABLES or table_info['table_name'] in self.ALLOWED_TABLES)
+        ]
+
+        # Columnas de todas las tablas en un solo round-trip
+        columns_by_table = self.get_all_columns([t['table_name'] for t in selected])
 
         # Construir estructura de tablas
         tables = {}
-        for table_info in tables_raw:
+        for table_info in selected:
             table_name = table_info['table_name']
 
-            # Filtrar tablas
-            if table_name in self.EXCLUDED_TABLES:
-                continue
-            if self.ALLOWED_TABLES and table_name not in self.ALLOWED_TABLES:
-                continue
-
             print(f"  Procesando tabla: {table_name}")
 
-            columns = self.get_columns(table_name)
-            table_pks = pks.get(table_name, [])
-
-            columns_dict = {}
-            for col in columns:
-                col_name = col['column_name']
-                is_pk = col_name in table_pks
-                fk_key = f"{table_name}.{col_name}"
-                fk_info = fk_map.get(fk_key)
+            columns = columns_by_table.get(table_name, [])
+            table_pks = frozenset(pks.get(table_name, ()))
 
-                columns_dict[col_name] = self.build_column_description(col, is_pk, fk_info)
+            columns_dict = {
+                col['column_name']: self.build_column_description(
+                    col,
+                    col['column_name'] in table_pks,
+                    fk_map.get((table_name, col['column_name'])),
+                )
+                for col in columns
+            }
 
             tables[table_name] = {
                 'description': self.TABLE_DESCRIPTIONS.get(table_name, table_info.get('comment') or f'Tabla {table_name}'),
@@ -276,25 +320,22 @@ class SchemaExtractor:
                     'type': 'many-to-one'
                 })
 
-        # Construir queries comunes
-        common_queries = {
-            'ventas_totales': "SELECT SUM(total_amount) FROM orders WHERE status = 'paid'",
-            'productos_vendidos': "SELECT oi.title, SUM(oi.quantity) as total FROM order_items oi JOIN orders o ON oi.order_id = o.id WHERE o.status = 'paid' GROUP BY oi.title ORDER BY total DESC",
-            'stock_bajo': "SELECT id, title, available_quantity FROM products WHERE available_quantity < 10 AND status = 'active'",
-            'tasa_escalado': "SELECT COUNT(*) FILTER (WHERE was_escalated) * 100.0 / NULLIF(COUNT(*), 0) FROM agent_interactions"
-        }
-
         return {
             'version': '2.0.0',
             'generated_at': datetime.utcnow().isoformat() + 'Z',
             'source': 'refresh_schema.py',
             'tables': tables,
             'relationships': relationships,
-            'common_queries': common_queries
+            'common_queries': dict(self.COMMON_QUERIES)
         }
 
 
 def main():
+    from dotenv import load_dotenv
+
+    # Cargar .env
+    load_dotenv()
+
     parser = argparse.ArgumentParser(description='Extrae esquema de Supabase')
     parser.add_argument('--output', '-o', default='data/schema_snapshot.json',
                        help='Archivo de salida (default: data/schema_snapshot.json)')
@@ -324,14 +365,13 @@ def main():
 
     if args.dry_run:
         print("\n[DRY RUN] JSON generado:")
-        print(json.dumps(schema, indent=2, ensure_ascii=False))
+        print(_dumps_schema(schema).decode('utf-8'))
     else:
         # Guardar archivo
-        output_path = Path(__file__).parent.parent / args.output
+        output_path = BACKEND_DIR / args.output
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(schema, f, indent=2, ensure_ascii=False)
+        output_path.write_bytes(_dumps_schema(schema))
 
         print(f"\nGuardado en: {output_path}")
 
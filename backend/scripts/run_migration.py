@@ -5,17 +5,22 @@ Soporta tanto el servidor local como Supabase.
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 # Add parent to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
 
-from dotenv import load_dotenv
-load_dotenv()
+# dotenv y psycopg se importan al ejecutar: importar el modulo no los carga
+if TYPE_CHECKING:
+    import psycopg
 
-import psycopg2
 
 def run_migration(postgres_url: str = None):
     """Ejecuta la migración 002_checkpoints.sql"""
+    import psycopg
+    from dotenv import load_dotenv
+    load_dotenv()
 
     # Obtener URL de PostgreSQL
     url = postgres_url or os.getenv("POSTGRES_URL")
@@ -27,50 +32,46 @@ def run_migration(postgres_url: str = None):
     print(f"URL: {url[:50]}...")
 
     try:
-        # Conectar
-        conn = psycopg2.connect(url)
-        conn.autocommit = True
-        cursor = conn.cursor()
+        # Conectar (prepare_threshold=None: compatible con PgBouncer/Supavisor)
+        with psycopg.connect(url, autocommit=True, prepare_threshold=None) as conn:
+            return _apply_migration(conn)
 
-        print("Conexión exitosa!")
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return False
 
-        # Leer archivo de migración
-        migration_path = Path(__file__).parent.parent / "migrations" / "002_checkpoints.sql"
 
-        if not migration_path.exists():
-            print(f"ERROR: No se encontró {migration_path}")
-            return False
+def _apply_migration(conn: "psycopg.Connection") -> bool:
+    """Aplica 002_checkpoints.sql y lista las tablas creadas"""
+    print("Conexión exitosa!")
 
-        print(f"Leyendo migración: {migration_path}")
-        sql = migration_path.read_text(encoding="utf-8")
+    # Leer archivo de migración
+    migration_path = BACKEND_DIR / "migrations" / "002_checkpoints.sql"
 
-        # Ejecutar migración
-        print("Ejecutando migración...")
-        cursor.execute(sql)
+    if not migration_path.exists():
+        print(f"ERROR: No se encontró {migration_path}")
+        return False
 
-        print("✅ Migración ejecutada exitosamente!")
+    print(f"Leyendo migración: {migration_path}")
+    sql = migration_path.read_text(encoding="utf-8")
 
-        # Verificar tablas creadas
-        cursor.execute("""
-            SELECT table_name FROM information_schema.tables
-            WHERE table_schema = 'public'
-            AND table_name IN ('checkpoints', 'checkpoint_writes', 'checkpoint_blobs', 'agent_memory')
-            ORDER BY table_name
-        """)
-        tables = cursor.fetchall()
+    # Ejecutar migración (sin parámetros: protocolo simple, admite varios statements)
+    print("Ejecutando migración...")
+    conn.execute(sql)
 
-        print(f"\nTablas creadas:")
-        for table in tables:
-            print(f"  - {table[0]}")
+    print("✅ Migración ejecutada exitosamente!")
 
-        cursor.close()
-        conn.close()
+    # Verificar tablas creadas
+    tables = conn.execute("""
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema = 'public'
+        AND table_name IN ('checkpoints', 'checkpoint_writes', 'checkpoint_blobs', 'agent_memory')
+        ORDER BY table_name
+    """).fetchall()
 
-        return True
+    print("\nTablas creadas:\n" + "".join(f"  - {name}\n" for (name,) in tables), end="")
 
-    except Exception as e:
-        print(f"ERROR: {e}")
-        return False
+    return True
 
 
 if __name__ == "__main__":
@@ -9,73 +9,21 @@ import os
 # Add backend to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from scripts._cert_common import run_checks, check_state, check_router, check_db
+
+CHECKS = [
+    ("InsightStateV2", "Checking state and graph compilation", check_state, ()),
+    ("IntentRouter", "Checking structured output", check_router, ()),
+    ("Database", "Checking database configuration", check_db, ()),
+]
+
+
 def main():
     print("=" * 60)
     print("SQL-Agent v2.5 - Final Verification")
     print("=" * 60)
 
-    errors = []
-
-    # Check 1: InsightStateV2 import
-    print("\n[1/4] Checking InsightStateV2 import...")
-    try:
-        from app.schemas.agent_state import InsightStateV2, create_initial_state
-        print("  [OK] InsightStateV2 imported successfully")
-
-        # Verify it has messages field with add_messages
-        state = create_initial_state(question="test", trace_id="test123")
-        assert "messages" in state, "State missing 'messages' field"
-        print("  [OK] InsightStateV2 has 'messages' field (memory enabled)")
-    except Exception as e:
-        errors.append(f"InsightStateV2: {e}")
-        print(f"  [FAIL] {e}")
-
-    # Check 2: Graph compilation
-    print("\n[2/4] Checking graph compilation...")
-    try:
-        from app.graphs.insight_graph import build_insight_graph_v2, InsightState
-
-        # Verify InsightState is InsightStateV2
-        assert InsightState is InsightStateV2, "InsightState should be alias to InsightStateV2"
-        print("  [OK] InsightState is correctly aliased to InsightStateV2")
-
-        # Build graph without checkpointer
-        graph = build_insight_graph_v2(checkpointer=None)
-        print("  [OK] Graph compiled successfully")
-    except Exception as e:
-        errors.append(f"Graph: {e}")
-        print(f"  [FAIL] {e}")
-
-    # Check 3: IntentRouter with structured output
-    print("\n[3/4] Checking IntentRouter...")
-    try:
-        from app.agents.intent_router import IntentRouter
-
-        # Check that _route_with_llm uses structured output (code inspection)
-        import inspect
-        source = inspect.getsource(IntentRouter._route_with_llm)
-        assert "with_structured_output" in source, "Missing with_structured_output"
-        assert "json.loads" not in source or "# legacy" in source.lower(), "Contains legacy json.loads"
-        print("  [OK] IntentRouter uses with_structured_output (no legacy parsing)")
-    except Exception as e:
-        errors.append(f"IntentRouter: {e}")
-        print(f"  [FAIL] {e}")
-
-    # Check 4: Database config
-    print("\n[4/4] Checking database configuration...")
-    try:
-        # Read main.py and verify prepare_threshold
-        main_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "main.py")
-        with open(main_path, "r", encoding="utf-8") as f:
-            main_content = f.read()
-
-        assert "prepare_threshold" in main_content, "Missing prepare_threshold config"
-        assert 'prepare_threshold": None' in main_content or "prepare_threshold=None" in main_content, \
-            "prepare_threshold should be None"
-        print("  [OK] Database pool has prepare_threshold=None (PgBouncer compatible)")
-    except Exception as e:
-        errors.append(f"Database: {e}")
-        print(f"  [FAIL] {e}")
+    errors = run_checks(CHECKS)
 
     # Summary
     print("\n" + "=" * 60)
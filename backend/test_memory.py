@@ -15,20 +15,16 @@ client = get_memory_client()
 print(f"\nMemoryClient is_available: {client.is_available}")
 
 if client.is_available:
-    # Try to insert a test message
-    result = client.insert("chat_messages", {
+    # Insert a test message; the stored row comes back in the same request
+    rows = client.insert_returning("chat_messages", {
         "thread_id": "test-thread-123",
         "user_id": "test-user",
         "role": "user",
         "content": "Test message from script",
         "metadata": {"test": True}
     })
-    print(f"Insert result: {result}")
-
-    # Try to select
-    rows = client.select("chat_messages", {"thread_id": "eq.test-thread-123"}, limit=5)
-    print(f"Select result: {len(rows)} rows")
-    for row in rows:
-        print(f"  - {row.get('content')}")
+    print(f"Insert result: {rows is not None}")
+    rows = rows or []
+    print(f"Returned rows: {len(rows)}\n" + "".join(f"  - {row.get('content')}\n" for row in rows), end="")
 else:
     print("MemoryClient is NOT available - check env vars")
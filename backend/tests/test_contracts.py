@@ -12,10 +12,7 @@ import pytest
 from datetime import date, datetime
 from typing import Optional
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+from pydantic import TypeAdapter
 
 from app.schemas.dashboard import (
     DashboardSpec,
@@ -36,59 +33,105 @@ from app.schemas.payload import (
 )
 from app.schemas.intent import QueryRequest, QueryPlan
 
+# Validate a whole list of variants in one call instead of one model per value
+_KPI_LIST_ADAPTER = TypeAdapter(list[KpiCardConfig])
+_CHART_LIST_ADAPTER = TypeAdapter(list[ChartConfig])
+
+
+def _extra_fields(model) -> dict:
+    """Fields stored under extra='allow', read straight from the extras dict."""
+    return model.__pydantic_extra__ or {}
+
+
+# Canonical spec/payload, built once per test class and shared by the tests
+# that only read them; tests needing another shape build their own.
+# model_construct skips validation: this is trusted fixture data, checked
+# once by test_valid_dashboard_spec / test_sample_payload_is_valid.
+@pytest.fixture(scope="class")
+def sample_spec():
+    return DashboardSpec.model_construct(
+        title="Test Dashboard",
+        subtitle="Test subtitle",
+        slots=SlotConfig.model_construct(
+            filters=[],
+            series=[
+                KpiCardConfig.model_construct(
+                    label="Total Sales",
+                    value_ref="kpi.total_sales",
+                    format="currency",
+                )
+            ],
+            charts=[
+                ChartConfig.model_construct(
+                    type="line_chart",
+                    title="Sales Over Time",
+                    dataset_ref="ts.sales_by_day",
+                )
+            ],
+            narrative=[
+                NarrativeConfig.model_construct(type="summary", text="Sales are up 10%.")
+            ],
+        ),
+    )
+
+
+@pytest.fixture(scope="class")
+def sample_payload():
+    return DataPayload.model_construct(
+        kpis=KPIData.model_construct(
+            total_sales=100000.0,
+            total_orders=50,
+            avg_order_value=2000.0,
+        ),
+        time_series=[
+            TimeSeriesData.model_construct(
+                series_name="sales_by_day",
+                points=[
+                    TimeSeriesPoint.model_construct(date="2024-12-01", value=10000.0),
+                    TimeSeriesPoint.model_construct(date="2024-12-02", value=15000.0),
+                ],
+            )
+        ],
+        datasets_meta=[
+            DatasetMeta.model_construct(
+                query_id="kpi_sales_summary",
+                row_count=1,
+                execution_time_ms=50.0,
+            )
+        ],
+        available_refs=["kpi.total_sales", "ts.sales_by_day"],
+    )
+
 
 class TestDashboardSpec:
     """Test DashboardSpec schema validation."""
 
-    def test_valid_dashboard_spec(self):
+    def test_valid_dashboard_spec(self, sample_spec):
         """Valid spec should be created successfully."""
-        spec = DashboardSpec(
-            title="Test Dashboard",
-            subtitle="Test subtitle",
-            slots=SlotConfig(
-                filters=[],
-                series=[
-                    KpiCardConfig(
-                        label="Total Sales",
-                        value_ref="kpi.total_sales",
-                        format="currency",
-                    )
-                ],
-                charts=[
-                    ChartConfig(
-                        type="line_chart",
-                        title="Sales Over Time",
-                        dataset_ref="ts.sales_by_day",
-                    )
-                ],
-                narrative=[
-                    NarrativeConfig(type="summary", text="Sales are up 10%.")
-                ],
-            ),
-        )
+        # Full validation of the (unvalidated) fixture data
+        spec = DashboardSpec.model_validate(sample_spec.model_dump())
+        assert spec == sample_spec
         assert spec.title == "Test Dashboard"
         assert len(spec.slots.series) == 1
         assert len(spec.slots.charts) == 1
 
     def test_kpi_card_formats(self):
         """KPI cards should accept valid formats."""
-        for fmt in ["currency", "number", "percent"]:
-            card = KpiCardConfig(
-                label="Test",
-                value_ref="kpi.test",
-                format=fmt,
-            )
-            assert card.format == fmt
+        formats = ["currency", "number", "percent"]
+        cards = _KPI_LIST_ADAPTER.validate_python([
+            {"label": "Test", "value_ref": "kpi.test", "format": fmt}
+            for fmt in formats
+        ])
+        assert [card.format for card in cards] == formats
 
     def test_chart_types(self):
         """Charts should accept valid types."""
-        for chart_type in ["line_chart", "bar_chart", "area_chart"]:
-            chart = ChartConfig(
-                type=chart_type,
-                title="Test Chart",
-                dataset_ref="ts.test",
-            )
-            assert chart.type == chart_type
+        chart_types = ["line_chart", "bar_chart", "area_chart"]
+        charts = _CHART_LIST_ADAPTER.validate_python([
+            {"type": chart_type, "title": "Test Chart", "dataset_ref": "ts.test"}
+            for chart_type in chart_types
+        ])
+        assert [chart.type for chart in charts] == chart_types
 
     def test_table_config(self):
         """Table config should have columns."""
@@ -114,43 +157,20 @@ class TestDataPayload:
         assert payload.kpis is None
         assert payload.time_series is None
 
-    def test_payload_with_kpis(self):
+    def test_sample_payload_is_valid(self, sample_payload):
+        """The shared payload fixture passes full validation."""
+        payload = DataPayload.model_validate(sample_payload.model_dump())
+        assert payload == sample_payload
+
+    def test_payload_with_kpis(self, sample_payload):
         """Payload with KPIs should work."""
-        payload = DataPayload(
-            kpis=KPIData(
-                total_sales=100000.0,
-                total_orders=50,
-                avg_order_value=2000.0,
-            ),
-            datasets_meta=[
-                DatasetMeta(
-                    query_id="kpi_sales_summary",
-                    row_count=1,
-                    execution_time_ms=50.0,
-                )
-            ],
-            available_refs=["kpi.total_sales", "kpi.total_orders"],
-        )
-        assert payload.kpis.total_sales == 100000.0
-        assert len(payload.available_refs) == 2
+        assert sample_payload.kpis.total_sales == 100000.0
+        assert len(sample_payload.available_refs) == 2
 
-    def test_payload_with_time_series(self):
+    def test_payload_with_time_series(self, sample_payload):
         """Payload with time series should work."""
-        payload = DataPayload(
-            time_series=[
-                TimeSeriesData(
-                    series_name="sales_by_day",
-                    points=[
-                        TimeSeriesPoint(date="2024-12-01", value=10000.0),
-                        TimeSeriesPoint(date="2024-12-02", value=15000.0),
-                    ],
-                )
-            ],
-            datasets_meta=[],
-            available_refs=["ts.sales_by_day"],
-        )
-        assert len(payload.time_series) == 1
-        assert len(payload.time_series[0].points) == 2
+        assert len(sample_payload.time_series) == 1
+        assert len(sample_payload.time_series[0].points) == 2
 
     def test_payload_with_top_items(self):
         """Payload with rankings should work."""
@@ -175,57 +195,57 @@ class TestDataPayload:
 class TestRefValidation:
     """Test that spec refs match payload available_refs."""
 
-    def test_all_refs_available(self):
+    def test_all_refs_available(self, sample_spec, sample_payload):
         """All refs in spec should exist in payload."""
+        missing = sample_spec.all_refs - sample_payload.available_refs_set
+        assert not missing, f"Refs {sorted(missing)} not in payload"
+
+    def test_all_refs_collects_spec_refs(self):
+        """all_refs covers KPI values, deltas and chart datasets, and tracks edits."""
         spec = DashboardSpec(
             title="Test",
             slots=SlotConfig(
                 series=[
+                    KpiCardConfig(label="Sales", value_ref="kpi.total_sales"),
                     KpiCardConfig(
-                        label="Sales",
-                        value_ref="kpi.total_sales",
-                        format="currency",
-                    )
+                        label="Orders",
+                        value_ref="kpi.total_orders",
+                        delta_ref="comparison.delta_orders_pct",
+                    ),
                 ],
                 charts=[
-                    ChartConfig(
-                        type="line_chart",
-                        title="Trend",
-                        dataset_ref="ts.sales_by_day",
-                    )
+                    ChartConfig(type="line_chart", title="Trend", dataset_ref="ts.sales_by_day"),
+                    TableConfig(title="Orders", dataset_ref="table.recent_orders", columns=["id"]),
                 ],
             ),
         )
-
-        payload = DataPayload(
-            kpis=KPIData(total_sales=100000.0),
-            time_series=[
-                TimeSeriesData(series_name="sales_by_day", points=[])
-            ],
-            datasets_meta=[],
-            available_refs=["kpi.total_sales", "ts.sales_by_day"],
-        )
-
-        # Extract refs from spec
-        spec_refs = []
-        for kpi in spec.slots.series:
-            spec_refs.append(kpi.value_ref)
-            if kpi.delta_ref:
-                spec_refs.append(kpi.delta_ref)
-        for chart in spec.slots.charts:
-            spec_refs.append(chart.dataset_ref)
-
-        # Validate all refs exist
-        for ref in spec_refs:
-            assert ref in payload.available_refs, f"Ref {ref} not in payload"
+        assert spec.all_refs == {
+            "kpi.total_sales",
+            "kpi.total_orders",
+            "comparison.delta_orders_pct",
+            "ts.sales_by_day",
+            "table.recent_orders",
+        }
+
+        spec.slots.charts = []
+        assert "ts.sales_by_day" not in spec.all_refs
+        assert "all_refs" not in spec.model_dump()
 
     def test_missing_ref_detectable(self):
         """Missing refs should be detectable."""
         spec_refs = ["kpi.total_sales", "ts.nonexistent"]
-        available_refs = ["kpi.total_sales", "ts.sales_by_day"]
+        available_refs = frozenset(["kpi.total_sales", "ts.sales_by_day"])
+
+        missing = set(spec_refs).difference(available_refs)
+        assert missing == {"ts.nonexistent"}
 
-        missing = [ref for ref in spec_refs if ref not in available_refs]
-        assert "ts.nonexistent" in missing
+    def test_available_refs_set_tracks_list(self):
+        """available_refs_set reflects refs appended after construction."""
+        payload = DataPayload(available_refs=["kpi.total_sales"])
+        payload.available_refs.append("ts.sales_by_day")
+
+        assert payload.available_refs_set == {"kpi.total_sales", "ts.sales_by_day"}
+        assert "available_refs_set" not in payload.model_dump()
 
 
 class TestQueryRequest:
@@ -320,8 +340,4 @@ class TestKPIData:
             total_sales=100000.0,
             custom_metric=42,  # Extra field
         )
-        assert hasattr(kpi, "custom_metric")
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+        assert _extra_fields(kpi) == {"custom_metric": 42}
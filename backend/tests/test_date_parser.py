@@ -0,0 +1,142 @@
+"""
+Date Parser Tests
+
+These tests verify that Spanish date expressions are parsed into
+ISO ranges (date_to exclusive) for:
+1. Relative expressions (hoy, ayer, ultimos N dias...)
+2. Absolute months, quarters and years
+3. Comparison queries between periods
+"""
+
+import pytest
+from datetime import date
+
+import app.utils.date_parser as date_parser
+from app.utils.date_parser import (
+    extract_date_range,
+    format_date_context,
+    is_comparison_query,
+    extract_comparison_dates,
+)
+
+
+class _FixedDate(date):
+    """date with a fixed today() (Monday 23/12/2024)."""
+
+    @classmethod
+    def today(cls):
+        return cls(2024, 12, 23)
+
+
+@pytest.fixture(autouse=True)
+def fixed_today(monkeypatch):
+    monkeypatch.setattr(date_parser, "date", _FixedDate)
+
+
+class TestRelativeDates:
+    """Test relative date expressions."""
+
+    @pytest.mark.parametrize("question,expected", [
+        ("ventas de hoy", ("2024-12-23", "2024-12-24")),
+        ("cuales fueron las ventas de ayer", ("2024-12-22", "2024-12-23")),
+        ("productos vendidos esta semana", ("2024-12-23", "2024-12-30")),
+        ("ventas de la semana pasada", ("2024-12-16", "2024-12-23")),
+        ("este mes", ("2024-12-01", "2025-01-01")),
+        ("reporte del ultimo mes", ("2024-11-01", "2024-12-01")),
+        ("ventas de los ultimos 7 dias", ("2024-12-16", "2024-12-24")),
+        ("ultimas 2 semanas", ("2024-12-09", "2024-12-24")),
+        ("ventas de los últimos 7 días", ("2024-12-16", "2024-12-24")),
+        ("reporte del último mes", ("2024-11-01", "2024-12-01")),
+    ])
+    def test_relative_expressions(self, question, expected):
+        assert extract_date_range(question) == expected
+
+    def test_cache_is_scoped_to_today(self, monkeypatch):
+        """The same question resolves again when the day changes."""
+        assert extract_date_range("ventas de hoy") == ("2024-12-23", "2024-12-24")
+
+        class _NextDay(date):
+            @classmethod
+            def today(cls):
+                return cls(2024, 12, 24)
+
+        monkeypatch.setattr(date_parser, "date", _NextDay)
+        assert extract_date_range("ventas de hoy") == ("2024-12-24", "2024-12-25")
+
+
+class TestAbsoluteDates:
+    """Test absolute months, quarters and years."""
+
+    @pytest.mark.parametrize("question,expected", [
+        ("ventas de diciembre 2024", ("2024-12-01", "2025-01-01")),
+        ("octubre de 2023", ("2023-10-01", "2023-11-01")),
+        ("ventas en marzo", ("2024-03-01", "2024-04-01")),
+        ("sept 2024", ("2024-09-01", "2024-10-01")),
+        ("resultados del Q4 2024", ("2024-10-01", "2025-01-01")),
+        ("primer trimestre 2024", ("2024-01-01", "2024-04-01")),
+        ("ventas del año 2023", ("2023-01-01", "2024-01-01")),
+        ("como me fue en el cyber monday 2023", ("2023-11-01", "2023-12-01")),
+    ])
+    def test_absolute_expressions(self, question, expected):
+        assert extract_date_range(question) == expected
+
+    def test_no_date(self):
+        assert extract_date_range("hola como estas") == (None, None)
+
+    def test_year_without_year_word_ignored(self):
+        assert extract_date_range("ventas 2024") == (None, None)
+
+
+class TestFormatDateContext:
+    """Test human readable ranges for the LLM."""
+
+    def test_full_month(self):
+        assert format_date_context("2024-12-01", "2025-01-01") == "diciembre 2024"
+
+    def test_single_day(self):
+        assert format_date_context("2024-12-05", "2024-12-06") == "05/12/2024"
+
+    def test_range(self):
+        assert format_date_context("2024-12-05", "2024-12-10") == "05/12/2024 a 09/12/2024"
+
+    def test_missing_dates_default(self):
+        assert format_date_context(None, None) == "ultimos 30 dias"
+
+    def test_invalid_dates_passthrough(self):
+        assert format_date_context("bad", "2024-01-01") == "bad a 2024-01-01"
+
+
+class TestComparisonDates:
+    """Test comparison detection and period extraction."""
+
+    @pytest.mark.parametrize("question", [
+        "diciembre vs noviembre",
+        "enero versus febrero",
+        "marzo comparado con febrero",
+        "noviembre contra octubre 2024",
+        "diferencia entre enero y febrero",
+        "ventas vs. mes pasado",
+        "comparación entre marzo y abril",
+    ])
+    def test_is_comparison(self, question):
+        assert is_comparison_query(question) is True
+
+    def test_not_comparison(self):
+        assert is_comparison_query("ventas de diciembre") is False
+
+    def test_month_vs_month(self):
+        result = extract_comparison_dates("ventas de dic vs nov 2024")
+        assert result.is_comparison is True
+        assert (result.current_period.date_from, result.current_period.date_to) == ("2024-12-01", "2025-01-01")
+        assert (result.previous_period.date_from, result.previous_period.date_to) == ("2024-11-01", "2024-12-01")
+        assert result.previous_period.label == "Noviembre 2024"
+
+    def test_previous_month_inferred(self):
+        result = extract_comparison_dates("diciembre 2024 vs mes anterior")
+        assert result.previous_period.label == "Noviembre 2024"
+
+    def test_non_comparison_defaults(self):
+        result = extract_comparison_dates("ventas")
+        assert result.is_comparison is False
+        assert result.current_period.date_from == "2024-11-23"
+        assert result.current_period.date_to == "2024-12-24"
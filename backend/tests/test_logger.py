@@ -0,0 +1,195 @@
+"""
+Structured Logger Tests
+
+These tests verify that the structured logger:
+1. Skips disabled levels without building the record
+2. Evaluates lazy detail callables only when the level is enabled
+   and attaches exceptions only inside an except block
+3. Formats records as text or JSON
+4. Writes through the background queue listener
+"""
+
+import json
+import logging
+import logging.handlers
+import pytest
+
+import app.utils.logger as logger_module
+from app.utils.logger import (
+    StructuredLogger,
+    StructuredFormatter,
+    configure_logging,
+    get_logger,
+    shutdown_logging,
+)
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def captured():
+    """A StructuredLogger whose records are collected in a list."""
+    logger = StructuredLogger("test_logger")
+    handler = _ListHandler()
+    logger._logger.addHandler(handler)
+    logger._logger.setLevel(logging.INFO)
+    yield logger, handler.records
+    logger._logger.removeHandler(handler)
+
+
+class TestLevelGating:
+    """Test that disabled levels are short-circuited."""
+
+    def test_disabled_level_skips_detail_callable(self, captured):
+        logger, records = captured
+        calls = []
+        logger.debug("t1", "hidden", lambda: calls.append(1) or {"k": 1})
+        assert calls == []
+        assert records == []
+
+    def test_enabled_level_evaluates_detail_callable(self, captured):
+        logger, records = captured
+        logger.info("t1", "shown", lambda: {"rows": 3})
+        assert len(records) == 1
+        assert records[0].detail == {"rows": 3}
+
+    def test_dict_detail_unchanged(self, captured):
+        logger, records = captured
+        logger.progress("t1", "step", {"step": 2})
+        assert records[0].detail == {"step": 2}
+        assert records[0].status == "PROGRESS"
+
+    def test_trace_id_interned(self, captured):
+        logger, records = captured
+        logger.info("".join(["trace", "-42"]), "a")
+        logger.info("".join(["trace", "-4", "2"]), "b")
+        assert records[0].trace_id is records[1].trace_id
+
+    def test_missing_trace_id(self, captured):
+        logger, records = captured
+        logger.info("", "no trace")
+        assert records[0].trace_id == "unknown"
+
+
+class TestErrorExcInfo:
+    """Test exception capture on error()."""
+
+    def test_no_active_exception(self, captured):
+        logger, records = captured
+        logger.error("t1", "synthetic")
+        assert not records[0].exc_info
+
+    def test_inside_except_attaches_exception(self, captured):
+        logger, records = captured
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("t1", "failed")
+        assert records[0].exc_info[0] is ValueError
+
+    def test_explicit_false(self, captured):
+        logger, records = captured
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logger.error("t1", "failed", exc_info=False)
+        assert not records[0].exc_info
+
+
+def _record(created: float) -> logging.LogRecord:
+    record = logging.LogRecord("sql-agent.Test", logging.INFO, __file__, 0, "hello", None, None)
+    record.created = created
+    record.trace_id = "t1"
+    record.status = "INFO"
+    record.node = "Test"
+    record.detail = {"rows": 3}
+    return record
+
+
+class TestStructuredFormatter:
+    """Test text and JSON output."""
+
+    def test_text_format(self):
+        line = StructuredFormatter().format(_record(1700000000.5))
+        assert line == '[Test] t1 | INFO | hello | rows=3'
+
+    def test_text_nested_detail_as_json(self):
+        record = _record(1700000000.5)
+        record.detail = {"ids": ["a", "b"], "rows": 3}
+        line = StructuredFormatter().format(record)
+        assert line == '[Test] t1 | INFO | hello | {"ids": ["a", "b"], "rows": 3}'
+
+    def test_text_without_detail(self):
+        record = _record(1700000000.5)
+        record.detail = None
+        assert StructuredFormatter().format(record) == '[Test] t1 | INFO | hello'
+
+    def test_json_timestamp_from_record(self):
+        formatter = StructuredFormatter(use_json=True)
+        first = json.loads(formatter.format(_record(1700000000.5)))
+        second = json.loads(formatter.format(_record(1700000000.25)))
+        assert first["ts"] == "2023-11-14T22:13:20.500000"
+        assert second["ts"] == "2023-11-14T22:13:20.250000"
+        assert first["detail"] == {"rows": 3}
+
+    def test_json_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(logger_module, "ORJSON_AVAILABLE", False)
+        payload = json.loads(StructuredFormatter(use_json=True).format(_record(1700000000.0)))
+        assert payload["detail"] == {"rows": 3}
+        assert payload["ts"] == "2023-11-14T22:13:20.000000"
+
+
+class TestGetLogger:
+    """Test the per-node logger cache."""
+
+    def test_same_instance_per_node(self):
+        logger = get_logger("CacheNode")
+        assert get_logger("CacheNode") is logger
+        assert logger._logger is logging.getLogger("sql-agent.CacheNode")
+
+    def test_slots_without_instance_dict(self):
+        assert not hasattr(get_logger("CacheNode"), "__dict__")
+
+
+class TestQueuedOutput:
+    """Test output through configure_logging's queue listener."""
+
+    def test_records_reach_stdout_with_exception(self, capsys):
+        root = logging.getLogger("sql-agent")
+        try:
+            configure_logging(level="INFO", format_type="json")
+            logger = StructuredLogger("Queued")
+            try:
+                raise ValueError("boom")
+            except ValueError:
+                logger.error("t9", "failed", {"step": 1})
+            shutdown_logging()
+        finally:
+            root.handlers = []
+            root.propagate = True
+
+        lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith("{")]
+        payload = json.loads(lines[-1])
+        assert payload["trace_id"] == "t9"
+        assert "ValueError: boom" in payload["exception"]
+
+    def test_fd_write(self, capfd):
+        root = logging.getLogger("sql-agent")
+        try:
+            configure_logging(level="INFO", format_type="text")
+            assert isinstance(root.handlers[0], logging.handlers.QueueHandler)
+            assert isinstance(logger_module._listener.handlers[0], logger_module._FdStreamHandler)
+            StructuredLogger("Fd").info("t7", "ñandú", {"rows": 1})
+            shutdown_logging()
+        finally:
+            root.handlers = []
+            root.propagate = True
+
+        assert "[Fd] t7 | INFO | ñandú | rows=1" in capfd.readouterr().out.splitlines()
@@ -0,0 +1,104 @@
+"""
+Robust JSON Parser Tests
+
+These tests verify that the robust parser recovers JSON from:
+1. Clean JSON and markdown code blocks
+2. JSON embedded in surrounding text
+3. Python-style single quotes
+4. Unparseable output (structured fallback)
+5. LLM-assisted correction
+"""
+
+import pytest
+
+from app.utils.robust_parser import RobustJSONParser, parse_json_robust
+
+
+class TestParseStrategies:
+    """Test each recovery strategy."""
+
+    def test_direct(self):
+        assert parse_json_robust('  {"a": 1}\n') == {"a": 1}
+
+    def test_direct_array(self):
+        assert parse_json_robust('[1, 2]') == [1, 2]
+
+    def test_markdown_block(self):
+        assert parse_json_robust('```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+
+    def test_embedded_in_text(self):
+        assert parse_json_robust('Aqui va: {"query_ids": ["kpi_sales_summary"]} listo') == {
+            "query_ids": ["kpi_sales_summary"]
+        }
+
+    def test_embedded_ignores_trailing_braces(self):
+        text = 'Respuesta: {"a": {"b": "}"}} y ademas {x}'
+        assert parse_json_robust(text) == {"a": {"b": "}"}}
+
+    def test_embedded_array_keeps_all_items(self):
+        assert parse_json_robust('[{"a": 1}, {"b": 2}] trailing') == [{"a": 1}, {"b": 2}]
+
+    def test_broken_object_not_replaced_by_nested_value(self):
+        text = 'Plan: {"query_ids": ["kpi_sales_summary"], "params": {"limit": 10},} fin'
+        assert RobustJSONParser()._extract_embedded_json(text) is None
+        result = parse_json_robust(text)
+        assert isinstance(result, dict)
+        assert result["query_ids"] == ["kpi_sales_summary"]
+
+    def test_object_preferred_over_earlier_array(self):
+        text = 'Elegi [2] queries: {"query_ids": ["kpi_sales_summary"], "params": {}}'
+        assert parse_json_robust(text) == {"query_ids": ["kpi_sales_summary"], "params": {}}
+
+    def test_broken_bracket_before_object_skipped(self):
+        assert parse_json_robust('[nota] {"a": 1}') == {"a": 1}
+
+    def test_single_quotes(self):
+        assert parse_json_robust("{'query_ids': ['top_products']}") == {"query_ids": ["top_products"]}
+
+    def test_structured_fallback(self):
+        result = parse_json_robust("query_ids: ['a', 'b'], params: {limit 5")
+        assert result == {"query_ids": ["a", "b"]}
+
+    def test_fallback_recovers_later_objects(self):
+        content = 'plan: {broken {"query_ids": ["q1"]} and {"params": {"limit": 5}} {oops'
+        result = RobustJSONParser()._extract_structured_fallback(content)
+        assert result == {"query_ids": ["q1"], "params": {"limit": 5}}
+
+    def test_fallback_keeps_nested_objects_nested(self):
+        content = '{"query_ids": ["a"], "params": {"limit": 5}, oops}'
+        result = RobustJSONParser()._extract_structured_fallback(content)
+        assert result == {"query_ids": ["a"], "params": {"limit": 5}}
+
+    def test_broken_plan_recovered_by_fallback(self):
+        text = 'Plan: {"query_ids": ["kpi_sales_summary"], "params": {"limit": 10},} fin'
+        assert parse_json_robust(text) == {
+            "query_ids": ["kpi_sales_summary"],
+            "params": {"limit": 10},
+        }
+
+    def test_empty(self):
+        assert RobustJSONParser().parse("   ") == {}
+
+
+class _FakeLLM:
+    """Returns the queued responses in order and records the messages sent."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def invoke(self, messages):
+        self.calls.append(messages)
+        content = self.responses.pop(0)
+        return type("Response", (), {"content": content})()
+
+
+class TestLLMFix:
+    """Test correction through the LLM fallback."""
+
+    def test_retry_reuses_message(self):
+        llm = _FakeLLM("still broken", '```json\n{"fixed": true}\n```')
+        assert RobustJSONParser(llm=llm).parse("{broken") == {"fixed": True}
+        assert len(llm.calls) == 2
+        assert llm.calls[0] is llm.calls[1]
+        assert "{broken" in llm.calls[0][0].content
@@ -0,0 +1,125 @@
+"""
+Schema Registry Tests
+
+These tests verify that the schema registry:
+1. Keeps table metadata consistent
+2. Generates DDL matching the shipped migrations
+"""
+
+import pytest
+
+from pathlib import Path
+
+from app.sql.schema_registry import (
+    SCHEMA_REGISTRY,
+    get_materialized_views,
+    generate_materialized_views_sql,
+    generate_fk_indexes,
+    generate_indexes_sql,
+    build_prefetch_joins,
+    SCHEMA_COLUMNS,
+    find_columns,
+)
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "migrations"
+
+
+class TestColumnIndex:
+    """Test the flat cross-table column index."""
+
+    def test_schema_columns_cover_registry(self):
+        """Every column of every table appears exactly once."""
+        total = sum(len(table.columns) for table in SCHEMA_REGISTRY.values())
+        assert len(SCHEMA_COLUMNS) == total
+
+    def test_find_columns_by_type(self):
+        """Type filter returns only matching columns."""
+        timestamps = find_columns(col_type="timestamptz")
+        assert ("ml_orders", "date_created") in {(t, c.name) for t, c in timestamps}
+        assert all(c.type == "timestamptz" for _, c in timestamps)
+
+
+class TestMaterializedViews:
+    """Test materialized view specs and their migration."""
+
+    def test_views_are_registered_as_tables(self):
+        """Every MV should be described in the registry for the LLM."""
+        for mv in get_materialized_views():
+            assert mv.name in SCHEMA_REGISTRY, f"{mv.name} missing TableInfo"
+
+    def test_unique_key_columns_exist(self):
+        """Unique key columns must be columns of the view."""
+        for mv in get_materialized_views():
+            columns = {col.name for col in SCHEMA_REGISTRY[mv.name].columns}
+            for key in mv.unique_key:
+                assert key in columns, f"{mv.name}: unknown key column {key}"
+
+    def test_migration_matches_registry(self):
+        """The shipped migration should be regenerated when specs change."""
+        migration = (MIGRATIONS_DIR / "003_materialized_views.sql").read_text(encoding="utf-8")
+        assert generate_materialized_views_sql() in migration
+
+
+class TestIndexGeneration:
+    """Test index DDL generated from the registry."""
+
+    def test_every_foreign_key_is_indexed(self):
+        """Each FK column of a base table gets an index."""
+        fk_indexes = generate_fk_indexes()
+        for table_name, table in SCHEMA_REGISTRY.items():
+            for col in table.columns:
+                if col.foreign_key and not table.is_view:
+                    assert f"ON {table_name} ({col.name});" in " ".join(fk_indexes)
+
+    def test_views_are_not_indexed(self):
+        """Plain views cannot carry indexes."""
+        ddl = generate_indexes_sql()
+        for table_name, table in SCHEMA_REGISTRY.items():
+            if table.is_view:
+                assert f"ON {table_name} " not in ddl
+
+    def test_no_duplicate_indexes(self):
+        """FK and filter columns may overlap; each index is emitted once."""
+        statements = generate_indexes_sql().splitlines()
+        assert len(statements) == len(set(statements))
+
+    def test_migration_matches_registry(self):
+        """The shipped migration should be regenerated when the registry changes."""
+        migration = (MIGRATIONS_DIR / "004_auto_indexes.sql").read_text(encoding="utf-8")
+        assert generate_indexes_sql() in migration
+
+
+class TestPrefetchJoins:
+    """Test eager-load join generation."""
+
+    def test_prefetch_targets_exist(self):
+        """prefetch_with should only name registered tables."""
+        for table in SCHEMA_REGISTRY.values():
+            for other_name in table.prefetch_with:
+                assert other_name in SCHEMA_REGISTRY
+
+    def test_join_from_base_table_fk(self):
+        """ml_orders joins ml_items through its item_id FK."""
+        joins = build_prefetch_joins("ml_orders", ["ml_orders.total_amount", "ml_items.title"])
+        assert joins == ["LEFT JOIN ml_items ON ml_orders.item_id = ml_items.item_id"]
+
+    def test_join_from_related_table_fk(self):
+        """conversations joins escalations through the FK declared on escalations."""
+        joins = build_prefetch_joins("conversations", ["escalations.reason"])
+        assert joins == ["LEFT JOIN escalations ON escalations.conversation_id = conversations.id"]
+
+    def test_unreferenced_tables_not_joined(self):
+        """No join when the projection only touches the base table."""
+        assert build_prefetch_joins("ml_orders", ["ml_orders.status", "total_amount"]) == []
+
+
+class TestGeneratedSchemaContext:
+    """Test the pre-generated schema context literal."""
+
+    def test_generated_context_up_to_date(self):
+        """Run scripts/build_schema_context.py when this fails."""
+        from app.sql import schema_docs, schema_registry
+        from app.sql.schema_context_generated import DOCS_SCHEMA_CONTEXT, REGISTRY_SCHEMA_CONTEXT
+
+        assert DOCS_SCHEMA_CONTEXT == schema_docs.get_schema_context()
+        assert REGISTRY_SCHEMA_CONTEXT == schema_registry.get_schema_context()
@@ -0,0 +1,62 @@
+"""
+SQL Rewrite Tests
+
+These tests verify that SQL rewrites:
+1. Only touch temporal columns in grouped queries
+2. Keep projected and grouped expressions consistent
+3. Keep the output type of the rewritten expression (date)
+"""
+
+import pytest
+from sqlglot import exp, parse_one
+
+from app.utils.sql_rewrite import rewrite_date_grouping, rewrite_sql, TEMPORAL_COLUMNS
+
+
+class TestDateGroupingRewrite:
+    """Test GROUP BY DATE(col) rewriting."""
+
+    def test_registry_timestamps_are_temporal(self):
+        """Timestamp columns from the registry are detected."""
+        assert "date_created" in TEMPORAL_COLUMNS
+        assert "created_at" in TEMPORAL_COLUMNS
+        assert "title" not in TEMPORAL_COLUMNS
+
+    def test_group_by_date_rewritten(self):
+        """DATE(col) becomes date_trunc in both SELECT and GROUP BY."""
+        sql = "SELECT DATE(date_created), SUM(total_amount) FROM ml_orders GROUP BY DATE(date_created)"
+        assert rewrite_date_grouping(sql) == (
+            "SELECT date_trunc('day', date_created)::date, SUM(total_amount) "
+            "FROM ml_orders GROUP BY date_trunc('day', date_created)::date"
+        )
+
+    def test_qualified_column_rewritten(self):
+        """Table-qualified columns keep their qualifier."""
+        sql = "SELECT date(o.date_created) d, COUNT(*) FROM ml_orders o GROUP BY 1"
+        assert "date_trunc('day', o.date_created)::date" in rewrite_date_grouping(sql)
+
+    def test_ungrouped_query_untouched(self):
+        """Without GROUP BY the query is returned as-is."""
+        sql = "SELECT * FROM ml_orders WHERE DATE(date_created) = CURRENT_DATE"
+        assert rewrite_sql(sql) == sql
+
+    def test_non_temporal_column_untouched(self):
+        """DATE() over unknown columns is left alone."""
+        sql = "SELECT DATE(some_text), COUNT(*) FROM t GROUP BY 1"
+        assert rewrite_sql(sql) == sql
+
+    def test_rewritten_projection_stays_date(self):
+        """The rewritten expression is cast back to date, like DATE(col)."""
+        sql = "SELECT DATE(date_created) AS date, SUM(total_amount) FROM ml_orders GROUP BY DATE(date_created)"
+        tree = parse_one(rewrite_sql(sql), read="postgres")
+
+        projected = tree.selects[0].this
+        assert isinstance(projected, exp.Cast)
+        assert projected.to.this == exp.DataType.Type.DATE
+        assert isinstance(projected.this, exp.TimestampTrunc)
+
+    def test_rewrite_is_idempotent(self):
+        """Running the rewrite twice does not nest casts."""
+        sql = "SELECT DATE(date_created), COUNT(*) FROM ml_orders GROUP BY DATE(date_created)"
+        once = rewrite_sql(sql)
+        assert rewrite_sql(once) == once
@@ -8,24 +8,82 @@ These tests verify that the SQL allowlist pattern prevents:
 4. Excessive data retrieval
 """
 
+import re
 import pytest
+from collections.abc import Mapping
 from datetime import date, timedelta
 from unittest.mock import Mock, patch
 
-import sys
-from pathlib import Path
-
-# Add app to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 from app.sql.allowlist import (
     QUERY_ALLOWLIST,
     get_query_template,
     validate_query_id,
+    validate_query_ids,
     build_params,
     get_available_queries,
 )
 
+# (query_id, template, output_type, output_ref, default_params) per query,
+# built once and used to parametrize the per-query tests
+ALLOWLIST_ROWS = [
+    (query_id, config.get("template", ""), config.get("output_type"),
+     config.get("output_ref"), config.get("default_params", {}))
+    for query_id, config in QUERY_ALLOWLIST.items()
+]
+ALLOWLIST_IDS = [row[0] for row in ALLOWLIST_ROWS]
+
+
+# Dangerous statements. Word boundaries avoid false positives like
+# CREATED_AT matching CREATE.
+DANGEROUS_SQL_PATTERNS = (
+    r"\bINSERT\s+INTO\b",
+    r"\bUPDATE\s+\w+\s+SET\b",
+    r"\bDELETE\s+FROM\b",
+    r"\bDROP\s+(TABLE|DATABASE|INDEX)\b",
+    r"\bTRUNCATE\s+TABLE\b",
+    r"\bALTER\s+TABLE\b",
+    r"\bCREATE\s+(TABLE|DATABASE|INDEX)\b",
+    r"\bGRANT\s+",
+    r"\bREVOKE\s+",
+    r"\bEXEC\s+",
+    r"\bEXECUTE\s+",
+)
+
+# Leading keyword of every pattern: a template without any of them
+# (case-folded substring check) cannot match, so the regex is skipped
+DANGEROUS_SQL_KEYWORDS = (
+    "INSERT", "UPDATE", "DELETE", "DROP", "TRUNCATE",
+    "ALTER", "CREATE", "GRANT", "REVOKE", "EXEC",
+)
+
+# All patterns fused into one scan; the named group tells which one fired
+DANGEROUS_SQL_RE = re.compile(
+    "|".join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(DANGEROUS_SQL_PATTERNS)),
+    re.IGNORECASE,
+)
+
+# Output types whose templates must cap the rows returned
+TYPES_REQUIRING_LIMIT = frozenset({"time_series", "table", "top_items"})
+
+# Case-insensitive scan of the template itself, no uppercased copy
+LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+VALID_OUTPUT_TYPES = frozenset({"kpi", "time_series", "top_items", "table"})
+
+# output_type -> (bare ref prefix, prefix with the dot), built once
+OUTPUT_REF_PREFIXES = {
+    output_type: (prefix, prefix + ".")
+    for output_type, prefix in {
+        "kpi": "kpi",
+        "time_series": "ts",
+        "top_items": "top",
+        "table": "table",
+    }.items()
+}
+
+# Upper bound for any query's default row limit
+MAX_DEFAULT_LIMIT = 1000
+
 
 class TestQueryAllowlist:
     """Test the SQL allowlist enforcement."""
@@ -36,48 +94,48 @@ class TestQueryAllowlist:
         assert "kpi_sales_summary" in QUERY_ALLOWLIST
         assert "recent_orders" in QUERY_ALLOWLIST
 
-    def test_all_queries_have_required_fields(self):
+    @pytest.mark.parametrize("query_id,config", QUERY_ALLOWLIST.items(), ids=ALLOWLIST_IDS)
+    def test_all_queries_have_required_fields(self, query_id, config):
         """Verify all queries have required configuration."""
         required_fields = ["description", "output_type", "output_ref", "template"]
 
-        for query_id, config in QUERY_ALLOWLIST.items():
-            for field in required_fields:
-                assert field in config, f"{query_id} missing {field}"
+        for field in required_fields:
+            assert field in config, f"{query_id} missing {field}"
 
-    def test_all_templates_are_select_only(self):
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_all_templates_are_select_only(self, row):
         """Verify no query templates contain dangerous SQL statements."""
-        import re
-        # Use word boundary regex to avoid false positives like CREATED_AT matching CREATE
-        dangerous_patterns = [
-            r"\bINSERT\s+INTO\b",
-            r"\bUPDATE\s+\w+\s+SET\b",
-            r"\bDELETE\s+FROM\b",
-            r"\bDROP\s+(TABLE|DATABASE|INDEX)\b",
-            r"\bTRUNCATE\s+TABLE\b",
-            r"\bALTER\s+TABLE\b",
-            r"\bCREATE\s+(TABLE|DATABASE|INDEX)\b",
-            r"\bGRANT\s+",
-            r"\bREVOKE\s+",
-            r"\bEXEC\s+",
-            r"\bEXECUTE\s+",
-        ]
-
-        for query_id, config in QUERY_ALLOWLIST.items():
-            template = config["template"].upper()
-            for pattern in dangerous_patterns:
-                match = re.search(pattern, template)
-                assert match is None, (
-                    f"{query_id} contains dangerous pattern: {pattern}"
-                )
-
-    def test_all_templates_have_limit(self):
+        query_id, template, _, _, _ = row
+        template_upper = template.upper()
+        if not any(keyword in template_upper for keyword in DANGEROUS_SQL_KEYWORDS):
+            return
+        match = DANGEROUS_SQL_RE.search(template)
+        assert match is None, (
+            f"{query_id} contains dangerous pattern: "
+            f"{DANGEROUS_SQL_PATTERNS[int(match.lastgroup[1:])]}"
+        )
+
+    @pytest.mark.parametrize("sql,pattern", [
+        ("DROP INDEX idx", r"\bDROP\s+(TABLE|DATABASE|INDEX)\b"),
+        ("update t set a = 1", r"\bUPDATE\s+\w+\s+SET\b"),
+    ])
+    def test_dangerous_pattern_reported(self, sql, pattern):
+        """The fused regex reports the sub-pattern that matched."""
+        match = DANGEROUS_SQL_RE.search(sql)
+        assert DANGEROUS_SQL_PATTERNS[int(match.lastgroup[1:])] == pattern
+
+    @pytest.mark.parametrize("pattern", DANGEROUS_SQL_PATTERNS)
+    def test_prefilter_covers_patterns(self, pattern):
+        """Every pattern starts with a keyword the prefilter looks for."""
+        leading_word = re.match(r"\\b(\w+)", pattern).group(1)
+        assert any(leading_word.startswith(keyword) for keyword in DANGEROUS_SQL_KEYWORDS)
+
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_all_templates_have_limit(self, row):
         """Verify time_series and table queries have LIMIT."""
-        types_requiring_limit = ["time_series", "table", "top_items"]
-
-        for query_id, config in QUERY_ALLOWLIST.items():
-            if config["output_type"] in types_requiring_limit:
-                template = config["template"].upper()
-                assert "LIMIT" in template, f"{query_id} missing LIMIT clause"
+        query_id, template, output_type, _, _ = row
+        if output_type in TYPES_REQUIRING_LIMIT:
+            assert LIMIT_RE.search(template), f"{query_id} missing LIMIT clause"
 
 
 class TestQueryValidation:
@@ -106,8 +164,27 @@ class TestQueryValidation:
             "kpi_sales_summary/**/",
         ]
 
-        for attempt in injection_attempts:
-            assert validate_query_id(attempt) is False, f"Should reject: {attempt}"
+        results = validate_query_ids(injection_attempts)
+        assert not any(results), (
+            f"Should reject: {[a for a, ok in zip(injection_attempts, results) if ok]}"
+        )
+
+    @pytest.mark.parametrize("query_id", [None, 42, ["kpi_sales_summary"]])
+    def test_non_string_query_id_rejected(self, query_id):
+        """Non-string query IDs are rejected instead of raising."""
+        assert validate_query_id(query_id) is False
+        assert validate_query_ids([query_id]) == [False]
+
+    @pytest.mark.parametrize("query_id", ALLOWLIST_IDS)
+    def test_allowlist_ids_are_identifiers(self, query_id):
+        """Every allowlisted ID passes the identifier prefilter."""
+        assert query_id.isidentifier()
+
+    def test_validate_query_ids_matches_single(self):
+        """Batch validation agrees with validate_query_id for each id."""
+        query_ids = ["kpi_sales_summary", "nonexistent_query", "recent_orders", ""]
+        assert validate_query_ids(query_ids) == [validate_query_id(q) for q in query_ids]
+        assert validate_query_ids([]) == []
 
 
 class TestParameterBuilding:
@@ -150,12 +227,20 @@ class TestParameterBuilding:
 class TestAvailableQueries:
     """Test query listing for LLM."""
 
-    def test_get_available_queries_returns_dict(self):
-        """Should return dict of query_id -> description."""
+    def test_get_available_queries_returns_mapping(self):
+        """Should return a mapping of query_id -> description."""
         queries = get_available_queries()
-        assert isinstance(queries, dict)
+        assert isinstance(queries, Mapping)
         assert len(queries) > 0
 
+    def test_get_available_queries_cached(self):
+        """Repeated calls return the same read-only mapping, built once."""
+        queries = get_available_queries()
+        assert queries is get_available_queries()
+        with pytest.raises(TypeError):
+            queries["injected"] = "not allowed"
+        assert "injected" not in get_available_queries()
+
     def test_descriptions_are_strings(self):
         """All descriptions should be non-empty strings."""
         queries = get_available_queries()
@@ -182,14 +267,14 @@ class TestQueryTemplates:
 class TestSQLInjectionPrevention:
     """Test SQL injection prevention in parameters."""
 
-    def test_param_values_not_concatenated(self):
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_param_values_not_concatenated(self, row):
         """Verify templates use parameterized queries, not string concat."""
-        for query_id, config in QUERY_ALLOWLIST.items():
-            template = config["template"]
-            # Should use %(param)s style, not f-strings or .format()
-            assert "{" not in template or "{{" in template, (
-                f"{query_id} may use unsafe string formatting"
-            )
+        query_id, template, _, _, _ = row
+        # Should use %(param)s style, not f-strings or .format()
+        assert "{" not in template or "{{" in template, (
+            f"{query_id} may use unsafe string formatting"
+        )
 
     def test_malicious_param_values(self):
         """Malicious parameter values should not affect query structure."""
@@ -210,54 +295,36 @@ class TestSQLInjectionPrevention:
 class TestOutputTypes:
     """Test output type configurations."""
 
-    VALID_OUTPUT_TYPES = ["kpi", "time_series", "top_items", "table"]
-
-    def test_all_output_types_valid(self):
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_all_output_types_valid(self, row):
         """All queries should have valid output types."""
-        for query_id, config in QUERY_ALLOWLIST.items():
-            assert config["output_type"] in self.VALID_OUTPUT_TYPES, (
-                f"{query_id} has invalid output_type: {config['output_type']}"
-            )
+        query_id, _, output_type, _, _ = row
+        assert output_type in VALID_OUTPUT_TYPES, (
+            f"{query_id} has invalid output_type: {output_type}"
+        )
 
-    def test_output_refs_follow_convention(self):
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_output_refs_follow_convention(self, row):
         """Output refs should follow naming convention."""
-        prefix_map = {
-            "kpi": "kpi",
-            "time_series": "ts",
-            "top_items": "top",
-            "table": "table",
-        }
-
-        for query_id, config in QUERY_ALLOWLIST.items():
-            output_type = config["output_type"]
-            output_ref = config["output_ref"]
-            expected_prefix = prefix_map[output_type]
-
-            # kpi can just be "kpi" without suffix
-            if output_type == "kpi" and output_ref == "kpi":
-                continue
-
-            assert output_ref.startswith(expected_prefix + ".") or output_ref == expected_prefix, (
-                f"{query_id}: output_ref '{output_ref}' should start with '{expected_prefix}.'"
-            )
+        query_id, _, output_type, output_ref, _ = row
+        bare, dotted = OUTPUT_REF_PREFIXES[output_type]
+
+        # The bare prefix alone is valid too (e.g. kpi refs can be just "kpi")
+        assert output_ref == bare or output_ref.startswith(dotted), (
+            f"{query_id}: output_ref '{output_ref}' should start with '{dotted}'"
+        )
 
 
 class TestQueryLimits:
     """Test that queries respect limits."""
 
-    MAX_LIMIT = 1000
-
-    def test_default_limits_reasonable(self):
+    @pytest.mark.parametrize("row", ALLOWLIST_ROWS, ids=ALLOWLIST_IDS)
+    def test_default_limits_reasonable(self, row):
         """Default limits should not be excessive."""
-        for query_id, config in QUERY_ALLOWLIST.items():
-            defaults = config.get("default_params", {})
-            if "limit" in defaults:
-                limit_fn = defaults["limit"]
-                limit_val = limit_fn() if callable(limit_fn) else limit_fn
-                assert limit_val <= self.MAX_LIMIT, (
-                    f"{query_id} has excessive default limit: {limit_val}"
-                )
-
-
-if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
+        query_id, _, _, _, defaults = row
+        if "limit" in defaults:
+            limit_fn = defaults["limit"]
+            limit_val = limit_fn() if callable(limit_fn) else limit_fn
+            assert limit_val <= MAX_DEFAULT_LIMIT, (
+                f"{query_id} has excessive default limit: {limit_val}"
+            )
@@ -0,0 +1,101 @@
+"""
+SQL Validator Tests
+
+These tests verify that the SQL validator:
+1. Rejects non-SELECT statements and dangerous functions
+2. Reports tables and risk levels from the AST
+3. Sanitizes comments and trailing semicolons
+"""
+
+import pytest
+
+from app.utils.sql_validator import (
+    SQLRiskLevel,
+    validate_sql_basic,
+    validate_sql_ast,
+    sanitize_sql,
+    extract_tables_from_query,
+    validate_and_sanitize,
+    _parse_cached,
+)
+
+
+class TestBasicValidation:
+    """Test text-level validation."""
+
+    @pytest.mark.parametrize("sql", [
+        "SELECT id FROM ml_orders",
+        "WITH t AS (SELECT 1) SELECT * FROM t",
+    ])
+    def test_select_allowed(self, sql):
+        assert validate_sql_basic(sql) == (True, "OK")
+
+    def test_keywords_case_insensitive(self):
+        assert validate_sql_basic("  select id from ml_orders") == (True, "OK")
+        assert validate_sql_basic("with t as (select 1) select * from t") == (True, "OK")
+        assert validate_sql_basic("select 1; drop table t")[1] == "Operación prohibida detectada: DROP"
+        assert validate_sql_basic("select PG_READ_FILE('x')")[1] == "Función peligrosa detectada: pg_read_file"
+
+    def test_cte_without_select_rejected(self):
+        assert not validate_sql_basic("WITH x")[0]
+
+    def test_non_select_rejected(self):
+        ok, msg = validate_sql_basic("DELETE FROM ml_orders")
+        assert not ok
+        assert "SELECT" in msg
+
+    def test_forbidden_operation_reported(self):
+        ok, msg = validate_sql_basic("SELECT 1; DROP TABLE ml_orders")
+        assert not ok
+        assert msg == "Operación prohibida detectada: DROP"
+
+    def test_forbidden_operation_needs_word_boundary(self):
+        assert validate_sql_basic("SELECT created_at, updated_by FROM ml_orders")[0]
+
+    def test_dangerous_function_reported(self):
+        ok, msg = validate_sql_basic("SELECT dblink_exec('x')")
+        assert not ok
+        assert msg == "Función peligrosa detectada: dblink_exec"
+
+    def test_comments_rejected(self):
+        assert not validate_sql_basic("SELECT 1 -- x")[0]
+
+
+class TestASTValidation:
+    """Test sqlglot-based validation."""
+
+    def test_tables_and_risk(self):
+        result = validate_sql_ast(
+            "SELECT o.id FROM ml_orders o JOIN ml_items i ON o.item_id = i.item_id"
+        )
+        assert result.is_valid
+        assert result.risk_level == SQLRiskLevel.SAFE
+        assert sorted(result.tables_accessed) == ["ml_items", "ml_orders"]
+
+    def test_sensitive_table_warns(self):
+        result = validate_sql_ast("SELECT * FROM users")
+        assert result.is_valid
+        assert result.risk_level == SQLRiskLevel.MEDIUM
+        assert result.warnings == ["Acceso a tabla sensible: users"]
+
+    def test_parse_shared_with_extract_tables(self):
+        """validate_and_sanitize and extract_tables_from_query parse once."""
+        sql = "SELECT id FROM ml_orders WHERE status = 'paid' -- cached"
+        _parse_cached.cache_clear()
+        is_valid, _, result = validate_and_sanitize(sql)
+        assert is_valid
+        assert extract_tables_from_query(sql) == result.tables_accessed
+        info = _parse_cached.cache_info()
+        assert (info.misses, info.hits) == (1, 1)
+
+    def test_extract_tables(self):
+        tables = extract_tables_from_query("SELECT * FROM ml_orders JOIN ml_items USING (item_id)")
+        assert sorted(tables) == ["ml_items", "ml_orders"]
+
+
+class TestSanitize:
+    """Test SQL sanitization."""
+
+    def test_strips_comments_and_whitespace(self):
+        sql = "SELECT id  -- comentario\nFROM /* x */ ml_orders;;"
+        assert sanitize_sql(sql) == "SELECT id FROM ml_orders;"